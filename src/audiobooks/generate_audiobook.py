@@ -6,25 +6,60 @@ import configparser
 import datetime
 import json
 import base64
+import email.parser
+import email.policy
+import email.utils
+from html import unescape as html_unescape
 import re
 import logging
 import subprocess
 import time
+import types
 import socket
+import functools
+import threading
 import glob
 from pathlib import Path
 import shutil # Keep for potential cleanup needs
+from concurrent.futures import ThreadPoolExecutor
 
 # 3rd Party Libraries
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+from googleapiclient.model import JsonModel
+from google_auth_httplib2 import AuthorizedHttp
+
+# HTML-to-text for newsletter bodies: selectolax (C tokenizer) when available,
+# lxml as a fallback, and precompiled regexes if neither is installed.
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:  # pragma: no cover
+        HTMLParser = None
+try:
+    import lxml.html as lxml_html
+except ImportError:  # pragma: no cover
+    lxml_html = None
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
 # Local CPU-based TTS generation (replaces the Colab handoff workflow)
-from generate_tts_audio import generate_audio_from_text
+from generate_tts_audio import (
+    generate_audio_from_text,
+    preload_pipeline,
+    run_in_background,
+)
 
 # --- Configuration & Constants ---
 # logger is defined later in setup_logging, so use a placeholder here if needed early.
@@ -36,6 +71,47 @@ UPLOAD_MP3_BASENAME = "temp_output"
 
 MAX_UPLOAD_SIZE_MB = 35.0 # Keep original for context, though local script might split it
 
+# Gmail accepts up to 100 calls per batch, but larger batches tend to get
+# per-call 429 rateLimitExceeded responses; Google recommends 50 or fewer.
+GMAIL_BATCH_SIZE = 50
+# Partial response: only what _parse_message and the mark-as-read pass read.
+# Drops threadId, snippet, historyId, internalDate and sizeEstimate per message.
+GMAIL_MESSAGE_FIELDS = "id,labelIds,raw"
+PARSE_WORKERS = 8  # Threads used to decode and clean fetched email bodies
+FETCH_WORKERS = 16  # Threads used when a batch fails and messages are fetched one by one
+
+# Patterns applied to every fetched email, compiled once at import.
+_WS_RE = re.compile(r"\s+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_NON_TEXT_TAGS = ("script", "style", "noscript", "template")
+# Regex HTML stripping, only used when no HTML parser is installed.
+_NON_TEXT_BLOCK_RE = re.compile(
+    r"<(%s)\b.*?</\1\s*>" % "|".join(_NON_TEXT_TAGS), re.IGNORECASE | re.DOTALL
+)
+_BLOCK_TAG_RE = re.compile(r"</?(?:p|h[1-6]|div|li|tr|td|br)\b[^>]*>", re.IGNORECASE)
+_ANY_TAG_RE = re.compile(r"<[^<]+?>")
+_URL_RE = re.compile(r"https?://\S+")
+_MD_LINK_RE = re.compile(r"\[([^\]]+)\]\(.*?\)")
+_DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+
+# A repeated trailing run shorter than this isn't worth trimming (e.g. "Thanks!").
+FOOTER_MIN_CHARS = 80
+
+# One pooled session for all Web App calls so the TLS handshake is paid once
+# per run instead of once per request. The adapter also retries gateway
+# errors; connection errors are retried by _requests_get_with_retry.
+_HTTP_RETRY = Retry(
+    total=3,
+    connect=0,
+    read=0,
+    status_forcelist=(502, 503, 504),
+    backoff_factor=0.3,
+    raise_on_status=False,
+)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=_HTTP_RETRY))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=_HTTP_RETRY))
+
 # Folder paths anchored to this script's directory so the pipeline works
 # regardless of cwd (cron, pipeline.py orchestrator, manual invocation).
 _SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -72,7 +148,7 @@ def _resolve_config_relative_path(config_dir, path_value):
 
 
 def load_config(config_path=None):
-    """Reads configuration from the INI file."""
+    """Reads configuration from the INI file into a read-only mapping."""
     if config_path is None:
         config_path = os.path.join(_SCRIPT_DIR, "config.ini")
     if not os.path.exists(config_path):
@@ -82,7 +158,7 @@ def load_config(config_path=None):
     config.read(config_path)
     config_dir = os.path.dirname(os.path.abspath(config_path))
     try:
-        return {
+        return types.MappingProxyType({
             "api_url": config["WebApp"]["API_URL"],
             "api_key": config["WebApp"]["API_KEY"],
             "credentials_file": _resolve_config_relative_path(
@@ -95,7 +171,7 @@ def load_config(config_path=None):
                 config_dir,
                 config.get("TTS", "REFERENCE_VOICE_FILE", fallback=None),
             ),
-        }
+        })
     except KeyError as e:
         logger.error(f"Missing key in config.ini: {e}")
         sys.exit(1)
@@ -110,8 +186,9 @@ def verify_authentication(api_url, api_key):
     headers = {"Authorization": f"Bearer {api_key}"}
 
     try:
-        # Use requests.get directly for this simple check
-        response = requests.get(test_url, headers=headers, timeout=15)
+        # Goes through the shared session, so the fetches that follow reuse
+        # this connection instead of opening a new one.
+        response = _SESSION.get(test_url, headers=headers, timeout=15)
 
         if response.status_code == 200:
             logger.info("✅ Authentication successful.")
@@ -139,9 +216,7 @@ def _requests_get_with_retry(url, headers, timeout=30, max_retries=3, backoff_ba
     """Performs a GET request with exponential-backoff retries on transient network errors."""
     for attempt in range(max_retries):
         try:
-            with requests.Session() as session:
-                response = session.get(url, headers=headers, timeout=timeout)
-            return response
+            return _SESSION.get(url, headers=headers, timeout=timeout)
         except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as exc:
             if attempt < max_retries - 1:
                 wait = backoff_base ** attempt
@@ -153,16 +228,33 @@ def _requests_get_with_retry(url, headers, timeout=30, max_retries=3, backoff_ba
             else:
                 raise
 
-def fetch_sources(api_url, api_key):
-    """Fetches newsletter sources from the Supabase Edge Function."""
+def _response_json(response):
+    """Decodes a JSON response body, with orjson when it's installed."""
+    if orjson is None:
+        return response.json()
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as exc:
+        # Same exception type as response.json(), which callers catch as a
+        # RequestException.
+        raise requests.exceptions.JSONDecodeError(exc.msg, exc.doc, exc.pos) from exc
+
+def fetch_sources(api_url, api_key, exit_on_error=True):
+    """
+    Fetches newsletter sources from the Supabase Edge Function. On a network
+    or decode error it logs and exits, or with exit_on_error=False (when run
+    off the main thread) raises the RequestException to the caller instead.
+    """
     logger.info("Fetching newsletter sources from Web App...")
     headers = {"Authorization": f"Bearer {api_key}"}
     url = f"{api_url}/sources"
     try:
         response = _requests_get_with_retry(url, headers, timeout=30)
         response.raise_for_status()
-        return response.json()
+        return _response_json(response)
     except requests.exceptions.RequestException as e:
+        if not exit_on_error:
+            raise
         logger.error(f"A network error occurred calling {url}", exc_info=True)
         sys.exit(1)
 
@@ -180,17 +272,16 @@ def find_last_upload_date(api_url, api_key):
             )
             return None
 
-        audiobooks = response.json()
+        audiobooks = _response_json(response)
         if not audiobooks:
             logger.info("No existing audiobooks found. Using yesterday as default start date.")
             return None
 
         last_date = None
-        date_pattern = re.compile(r"(\d{4}-\d{2}-\d{2})")
 
         for audiobook in audiobooks:
             title = audiobook.get("title", "")
-            match = date_pattern.search(title)
+            match = _DATE_RE.search(title)
             if match:
                 try:
                     date_str = match.group(1)
@@ -229,7 +320,7 @@ def check_existing_audiobook(api_url, api_key, title):
             )
             return False
 
-        audiobooks = response.json()
+        audiobooks = _response_json(response)
         for audiobook in audiobooks:
             if audiobook.get("title") == title:
                 logger.info(f"Audiobook '{title}' already exists. Skipping generation.")
@@ -259,10 +350,40 @@ def authenticate_gmail(token_file, credentials_file):
             token.write(creds.to_json())
     return creds
 
-def _execute_with_retry(request_obj, max_retries=3, backoff_base=2):
-    """Execute a Google API request, retrying on transient network errors."""
+class _OrjsonModel(JsonModel):
+    """JsonModel that parses response bodies with orjson. Raw-format message
+    responses carry the whole base64 email, so this is the bulk of the
+    client-side parsing work."""
+
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return super().deserialize(content)
+        if self._data_wrapper and "data" in body:
+            body = body["data"]
+        return body
+
+
+def build_gmail_service(creds):
+    """Builds the Gmail client from the discovery document bundled with
+    google-api-python-client, so no discovery request goes over the network."""
+    return build(
+        "gmail",
+        "v1",
+        credentials=creds,
+        static_discovery=True,
+        cache_discovery=False,
+        model=_OrjsonModel() if orjson is not None else None,
+    )
+
+def _execute_with_retry(request_obj, max_retries=3, backoff_base=2, http=None):
+    """Execute a Google API request, retrying on transient network errors
+    and on 429 rate-limit responses."""
     for attempt in range(max_retries):
         try:
+            if http is not None:
+                return request_obj.execute(http=http)
             return request_obj.execute()
         except (TimeoutError, socket.timeout, ConnectionResetError, OSError) as exc:
             if attempt < max_retries - 1:
@@ -274,17 +395,131 @@ def _execute_with_retry(request_obj, max_retries=3, backoff_base=2):
                 time.sleep(wait)
             else:
                 raise
-        except HttpError:
-            raise  # HTTP-level errors are not transient
+        except HttpError as exc:
+            # Other HTTP-level errors are not transient.
+            if exc.resp.status != 429 or attempt == max_retries - 1:
+                raise
+            wait = backoff_base ** attempt
+            logger.warning(
+                f"Rate limited on attempt {attempt + 1}/{max_retries}. Retrying in {wait}s..."
+            )
+            time.sleep(wait)
+
+def _fetch_messages_batched(service, message_ids, creds=None):
+    """
+    Fetches raw (RFC 822) Gmail messages through BatchHttpRequest,
+    GMAIL_BATCH_SIZE calls per HTTP round-trip instead of one round-trip
+    per message. Messages that fail inside a batch (typically per-call 429s),
+    or all of a batch's messages if the batch itself fails, are fetched again
+    one by one (see _fetch_messages_individually for `creds`). Returns
+    {message_id: message}; messages that still fail are logged and omitted.
+    """
+    fetched = {}
+    failed = []
+
+    def _collect(request_id, response, exception):
+        if exception is not None:
+            failed.append(request_id)
+            return
+        fetched[request_id] = response
+
+    for start in range(0, len(message_ids), GMAIL_BATCH_SIZE):
+        chunk = message_ids[start:start + GMAIL_BATCH_SIZE]
+        batch = service.new_batch_http_request(callback=_collect)
+        for msg_id in chunk:
+            batch.add(
+                service.users().messages().get(
+                    userId="me", id=msg_id, format="raw", fields=GMAIL_MESSAGE_FIELDS
+                ),
+                request_id=msg_id,
+            )
+        try:
+            _execute_with_retry(batch)
+        except (HttpError, TimeoutError, OSError) as exc:
+            logger.warning(
+                f"Batch fetch of {len(chunk)} email(s) failed: {exc}. "
+                f"Falling back to individual requests."
+            )
+            _fetch_messages_individually(
+                service,
+                [msg_id for msg_id in chunk if msg_id not in fetched],
+                fetched,
+                creds,
+            )
+        else:
+            if failed:
+                logger.warning(
+                    f"{len(failed)} email(s) failed inside the batch. Retrying individually."
+                )
+                _fetch_messages_individually(service, list(failed), fetched, creds)
+        failed.clear()
+    return fetched
+
+
+_thread_local = threading.local()
+
+
+def _thread_http(creds):
+    """One authorized Http per worker thread; httplib2 connections aren't thread-safe."""
+    cached = getattr(_thread_local, "http", None)
+    if cached is None or cached[0] is not creds:
+        cached = (creds, AuthorizedHttp(creds, http=build_http()))
+        _thread_local.http = cached
+    return cached[1]
+
+
+def _fetch_messages_individually(service, message_ids, fetched, creds=None):
+    """Fallback for a failed batch: messages.get calls, stored into `fetched`.
+    With `creds` the calls run in parallel, each worker on its own Http;
+    without them they share the service's Http and so run one at a time."""
+
+    def _fetch_one(msg_id):
+        try:
+            return _execute_with_retry(
+                service.users().messages().get(
+                    userId="me", id=msg_id, format="raw", fields=GMAIL_MESSAGE_FIELDS
+                ),
+                http=_thread_http(creds) if creds is not None else None,
+            )
+        except (HttpError, TimeoutError, OSError) as exc:
+            logger.error(f"Failed to fetch email {msg_id}: {exc}. Skipping.")
+            return None
+
+    workers = FETCH_WORKERS if creds is not None else 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for msg_id, msg in zip(message_ids, executor.map(_fetch_one, message_ids)):
+            if msg is not None:
+                fetched[msg_id] = msg
+
+
+def _html_to_text(html):
+    """Extracts the readable text of an HTML body, with entities decoded and whitespace collapsed."""
+    if HTMLParser is not None:
+        tree = HTMLParser(html)
+        # Tracking scripts and CSS are text nodes too; don't read them aloud.
+        tree.strip_tags(list(_NON_TEXT_TAGS))
+        root = tree.body if tree.body is not None else tree.root
+        text = root.text(separator=" ") if root is not None else ""
+    elif lxml_html is not None:
+        doc = lxml_html.fromstring(html)
+        for element in doc.iter(*_NON_TEXT_TAGS):
+            element.drop_tree()
+        text = doc.text_content()
+    else:
+        text = _NON_TEXT_BLOCK_RE.sub(" ", html)
+        # Block-level tags separate words; inline tags don't.
+        text = _BLOCK_TAG_RE.sub(" ", text)
+        text = html_unescape(_ANY_TAG_RE.sub("", text))
+    return _WS_RE.sub(" ", text).strip()
 
 def remove_markdown_links(text):
     """Removes markdown link syntax like [text](url) and leaves just the text."""
-    return re.sub(r"\[([^\]]+)\]\(.*?\)", r"\1", text)
+    return _MD_LINK_RE.sub(r"\1", text)
 
 def _extract_date_from_filename(file_path):
     """Extracts a YYYY-MM-DD date from the filename. Returns a date object or None."""
     filename = os.path.basename(file_path)
-    match = re.search(r"(\d{4}-\d{2}-\d{2})", filename)
+    match = _DATE_RE.search(filename)
     if match:
         try:
             return datetime.datetime.strptime(match.group(1), "%Y-%m-%d").date()
@@ -308,7 +543,6 @@ def process_raw_content_files(target_date):
         return "", []
 
     raw_text_blocks = []
-    all_raw_text = ""
 
     for file_path in txt_files:
         try:
@@ -331,7 +565,6 @@ def process_raw_content_files(target_date):
                     title = f"Raw Content: {filename}"
                     text_block = f"\\n\\nRaw Content from: {filename}.\\n\\n{content}"
                     raw_text_blocks.append({"text": text_block, "title": title})
-                    all_raw_text += text_block
                     logger.info(f"Successfully processed raw content file: {filename} ({len(content)} characters)")
                 else:
                     logger.warning(f"Raw content file is empty: {os.path.basename(file_path)}")
@@ -345,84 +578,18 @@ def process_raw_content_files(target_date):
     else:
         logger.info(f"No raw content files found for {target_date.strftime('%Y-%m-%d')}")
 
-    return all_raw_text, raw_text_blocks
-
-def process_emails(service, sources, target_date_str):
-    """Processes emails for a given date."""
-    logger.info(f"Processing emails for date: {target_date_str}")
-    sender_emails = [source["sender_email"] for source in sources]
-    if not sender_emails: return "", []
-
-    sender_query = " OR ".join([f"from:{email}" for email in sender_emails])
-    target_date = datetime.datetime.strptime(target_date_str, "%Y-%m-%d").date()
-    after_date = target_date.strftime("%Y/%m/%d")
-    before_date = (target_date + datetime.timedelta(days=1)).strftime("%Y/%m/%d")
-    query = f"({sender_query}) after:{after_date} before:{before_date}"
-    logger.info(f"Using Gmail query: {query}")
-
-    try:
-        results = _execute_with_retry(service.users().messages().list(userId="me", q=query))
-        messages = results.get("messages", [])
-    except (HttpError, TimeoutError, OSError) as error:
-        logger.error(f"An error occurred fetching emails: {error}", exc_info=True)
-        return "", []
-
-    if not messages: return "", []
-
-    all_text_blocks = []
-    sender_to_custom_name = {s["sender_email"].lower(): s["custom_name"] for s in sources}
-
-    for msg_info in reversed(messages):
-        try:
-            msg = _execute_with_retry(service.users().messages().get(userId="me", id=msg_info["id"]))
-        except (HttpError, TimeoutError, OSError) as exc:
-            logger.error(f"Failed to fetch email {msg_info['id']} after retries: {exc}. Skipping.", exc_info=True)
-            continue
+    return "".join(b["text"] for b in raw_text_blocks), raw_text_blocks
 
-        if "UNREAD" in msg.get("labelIds", []):
-            try:
-                subject = next((h["value"] for h in msg["payload"]["headers"] if h["name"] == "Subject"), "No Subject")
-                logger.info(f"Marking email as read: '{subject[:50]}...' (ID: {msg_info['id']})")
-                _execute_with_retry(
-                    service.users().messages().modify(
-                        userId="me", id=msg_info["id"], body={"removeLabelIds": ["UNREAD"]}
-                    )
-                )
-            except (HttpError, TimeoutError, OSError) as e:
-                logger.warning(f"Could not mark email {msg_info['id']} as read. Error: {e}. Continuing.")
-
-        headers = msg["payload"]["headers"]
-        sender_email = next(
-            (match.group(1).lower() for h in headers if h["name"] == "From" and (match := re.search(r"<(.+?)>", h["value"]))),
-            "",
-        )
-        custom_name = sender_to_custom_name.get(sender_email, "Unknown Source")
-        body_text = ""
-        try:
-            if "parts" in msg["payload"]:
-                part = next((p for p in msg["payload"]["parts"] if p["mimeType"] in ["text/plain", "text/html"]), None)
-                if part:
-                    data = base64.urlsafe_b64decode(part["body"]["data"])
-                    body_text = data.decode("utf-8", errors="replace")
-                    if part["mimeType"] == "text/html":
-                        body_text = re.sub("<[^<]+?>", "", body_text)
-            else:
-                data = base64.urlsafe_b64decode(msg["payload"]["body"]["data"])
-                body_text = data.decode("utf-8", errors="replace")
-            text_block = f"\\n\\nNewsletter from: {custom_name}.\\n\\n{body_text.strip()}"
-            all_text_blocks.append({"text": text_block, "title": custom_name})
-        except Exception:
-            logger.error(f"Failed to parse email from {custom_name}", exc_info=True)
-            all_text_blocks.append({"text": f"\\n\\n{custom_name} could not be processed.\\n\\n", "title": f"{custom_name} (Error)"})
-
-    return "".join([b["text"] for b in all_text_blocks]), all_text_blocks
-
-def process_emails_and_raw_content(service, sources, target_date_str):
+def process_emails_and_raw_content(
+    service, sources, target_date_str, senders=None, creds=None
+):
     """Combines email and raw content processing results."""
     logger.info(f"Processing emails and raw content for date: {target_date_str}")
     target_date = datetime.datetime.strptime(target_date_str, "%Y-%m-%d").date()
 
-    email_text, email_blocks = process_emails(service, sources, target_date_str)
+    email_text, email_blocks = process_emails(
+        service, sources, target_date_str, senders=senders, creds=creds
+    )
     raw_text, raw_blocks = process_raw_content_files(target_date)
 
     combined_text = email_text + raw_text
@@ -440,12 +607,74 @@ def process_emails_and_raw_content(service, sources, target_date_str):
     return combined_text, combined_blocks
 
 
-def process_emails(service, sources, target_date_str):
+def _parse_message(msg, sender_to_custom_name):
+    """Turn a raw-format Gmail message into a text block for the digest."""
+    custom_name = "Unknown Source"
+    try:
+        raw = base64.urlsafe_b64decode(msg["raw"])
+        em = email.parser.BytesParser(policy=email.policy.default).parsebytes(raw)
+        sender_email = email.utils.parseaddr(str(em.get("From", "")))[1].lower()
+        custom_name = sender_to_custom_name.get(sender_email, "Unknown Source")
+
+        body_text = ""
+        part = em.get_body(preferencelist=("plain", "html"))
+        if part is not None:
+            body_text = part.get_content()
+            if part.get_content_type() == "text/html":
+                body_text = _html_to_text(body_text)
+        text_block = f"\n\nNewsletter from: {custom_name}.\n\n{body_text.strip()}"
+        return {"text": text_block, "title": custom_name}
+    except Exception:
+        logger.error(f"Failed to parse email from {custom_name}", exc_info=True)
+        return {
+            "text": f"\n\n{custom_name} could not be processed.\n\n",
+            "title": f"{custom_name} (Error)",
+        }
+
+
+def _drop_repeated_footers(text_blocks):
+    """
+    Trim trailing sentences that already appeared in an earlier block, so
+    shared newsletter footers ("You received this because...") are only
+    read aloud once. Modifies the blocks in place.
+    """
+    seen = set()
+    for block in text_blocks:
+        text = block["text"]
+        starts = [0] + [m.end() for m in _SENTENCE_END_RE.finditer(text)]
+        sentences = [
+            text[start:end].strip()
+            for start, end in zip(starts, starts[1:] + [len(text)])
+        ]
+        # Never trim the first sentence: it's the "Newsletter from" intro.
+        cut = len(sentences)
+        while cut > 1 and sentences[cut - 1] in seen:
+            cut -= 1
+        if cut < len(sentences) and len(text) - starts[cut] >= FOOTER_MIN_CHARS:
+            logger.info(
+                f"Dropped {len(text) - starts[cut]} chars of repeated footer from {block['title']}"
+            )
+            block["text"] = text[: starts[cut]].rstrip()
+        seen.update(sentences)
+
+
+def build_sender_index(sources):
+    """
+    Returns (gmail_sender_query, sender_email -> custom_name) for the sources.
+    Both depend only on the sources, so main builds them once for all dates.
+    """
+    sender_query = " OR ".join(f"from:{s['sender_email']}" for s in sources)
+    sender_to_custom_name = {
+        s["sender_email"].lower(): s["custom_name"] for s in sources
+    }
+    return sender_query, sender_to_custom_name
+
+
+def process_emails(service, sources, target_date_str, senders=None, creds=None):
     logger.info(f"Processing emails for date: {target_date_str}")
-    sender_emails = [source["sender_email"] for source in sources]
-    if not sender_emails:
+    if not sources:
         return "", []
-    sender_query = " OR ".join([f"from:{email}" for email in sender_emails])
+    sender_query, sender_to_custom_name = senders or build_sender_index(sources)
     target_date = datetime.datetime.strptime(target_date_str, "%Y-%m-%d").date()
     after_date = target_date.strftime("%Y/%m/%d")
     before_date = (target_date + datetime.timedelta(days=1)).strftime("%Y/%m/%d")
@@ -459,83 +688,43 @@ def process_emails(service, sources, target_date_str):
         return "", []
     if not messages:
         return "", []
-    all_text_blocks = []
-    sender_to_custom_name = {
-        s["sender_email"].lower(): s["custom_name"] for s in sources
-    }
-    for msg_info in reversed(messages):
-        try:
-            msg = _execute_with_retry(
-                service.users().messages().get(userId="me", id=msg_info["id"])
-            )
-        except (HttpError, TimeoutError, OSError) as exc:
-            logger.error(
-                f"Failed to fetch email {msg_info['id']} after retries: {exc}. Skipping.",
-                exc_info=True,
+    ordered_ids = [msg_info["id"] for msg_info in reversed(messages)]
+    fetched = _fetch_messages_batched(service, ordered_ids, creds)
+    messages_to_parse = [fetched[msg_id] for msg_id in ordered_ids if msg_id in fetched]
+
+    # Decoding and HTML-to-text are independent per message, so run them
+    # in a pool; map() keeps the original message order.
+    with ThreadPoolExecutor(max_workers=PARSE_WORKERS) as executor:
+        all_text_blocks = list(
+            executor.map(
+                lambda m: _parse_message(m, sender_to_custom_name), messages_to_parse
             )
-            continue
-        if "UNREAD" in msg.get("labelIds", []):
-            try:
-                subject = next(
-                    (
-                        h["value"]
-                        for h in msg["payload"]["headers"]
-                        if h["name"] == "Subject"
-                    ),
-                    "No Subject",
-                )
-                logger.info(
-                    f"Marking email as read: '{subject[:50]}...' (ID: {msg_info['id']})"
-                )
-                _execute_with_retry(
-                    service.users().messages().modify(
-                        userId="me", id=msg_info["id"], body={"removeLabelIds": ["UNREAD"]}
-                    )
-                )
-            except (HttpError, TimeoutError, OSError) as e:
-                logger.warning(
-                    f"Could not mark email {msg_info['id']} as read. Error: {e}. Continuing."
-                )
-        headers = msg["payload"]["headers"]
-        sender_email = next(
-            (
-                match.group(1).lower()
-                for h in headers
-                if h["name"] == "From" and (match := re.search(r"<(.+?)>", h["value"]))
-            ),
-            "",
         )
-        custom_name = sender_to_custom_name.get(sender_email, "Unknown Source")
-        body_text = ""
+    _drop_repeated_footers(all_text_blocks)
+
+    unread = [
+        (msg["id"], block["title"])
+        for msg, block in zip(messages_to_parse, all_text_blocks)
+        if "UNREAD" in msg.get("labelIds", [])
+    ]
+    if unread:
+        unread_ids = [msg_id for msg_id, _ in unread]
+        for msg_id, title in unread:
+            logger.info(f"Marking email as read: '{title}' (ID: {msg_id})")
         try:
-            if "parts" in msg["payload"]:
-                part = next(
-                    (
-                        p
-                        for p in msg["payload"]["parts"]
-                        if p["mimeType"] in ["text/plain", "text/html"]
-                    ),
-                    None,
+            # One batchModify call (up to 1000 ids) instead of a modify
+            # round-trip per message.
+            _execute_with_retry(
+                service.users().messages().batchModify(
+                    userId="me",
+                    body={"ids": unread_ids, "removeLabelIds": ["UNREAD"]},
                 )
-                if part:
-                    data = base64.urlsafe_b64decode(part["body"]["data"])
-                    body_text = data.decode("utf-8", errors="replace")
-                    if part["mimeType"] == "text/html":
-                        body_text = re.sub("<[^<]+?>", "", body_text)
-            else:
-                data = base64.urlsafe_b64decode(msg["payload"]["body"]["data"])
-                body_text = data.decode("utf-8", errors="replace")
-            text_block = f"\n\nNewsletter from: {custom_name}.\n\n{body_text.strip()}"
-            all_text_blocks.append({"text": text_block, "title": custom_name})
-        except Exception:
-            logger.error(f"Failed to parse email from {custom_name}", exc_info=True)
-            all_text_blocks.append(
-                {
-                    "text": f"\n\n{custom_name} could not be processed.\n\n",
-                    "title": f"{custom_name} (Error)",
-                }
             )
-    return "".join([b["text"] for b in all_text_blocks]), all_text_blocks
+        except (HttpError, TimeoutError, OSError) as e:
+            logger.warning(
+                f"Could not mark emails {', '.join(unread_ids)} as read. Error: {e}. Continuing."
+            )
+    return "".join(b["text"] for b in all_text_blocks), all_text_blocks
 
 
 def save_cleaned_text(text_content: str, date_str: str) -> str:
@@ -594,10 +783,15 @@ def upload_audio(
 
 
 def generate_and_upload_audio(
-    text_content: str, text_blocks: list, config: dict, date_str: str
+    text_content: str,
+    text_blocks: list,
+    config: dict,
+    date_str: str,
+    keep_pipeline: bool = False,
 ) -> list:
     """
-    Generate the MP3 with local Kokoro TTS (CPU) and upload it.
+    Generate the MP3 with local Kokoro TTS (CPU) and upload it. With
+    keep_pipeline the TTS model stays loaded for the next date.
     Returns a list of file paths created for cleanup.
     """
     if not text_content.strip():
@@ -611,11 +805,20 @@ def generate_and_upload_audio(
     mp3_filename = f"digest_{date_str}_cleaned_generated_audio.mp3"
     mp3_filepath = os.path.join(ARCHIVE_FOLDER, mp3_filename)
 
+    # Feed the blocks separately: each ends at a natural boundary, and the
+    # joined text would let one source's last sentence run into the next.
+    tts_input = [block["text"] for block in text_blocks] if text_blocks else text_content
     try:
-        generate_audio_from_text(text_content, mp3_filepath)
+        _, block_durations = generate_audio_from_text(
+            tts_input, mp3_filepath, keep_pipeline=keep_pipeline
+        )
     except Exception as e:
         logger.error(f"❌ TTS generation failed: {e}", exc_info=True)
         return []
+    if text_blocks and len(block_durations) == len(text_blocks):
+        # Measured audio length per block, used to place the chapter marks.
+        for block, duration_s in zip(text_blocks, block_durations):
+            block["duration_s"] = duration_s
 
     success = upload_audio(mp3_filepath, config, date_str, text_blocks)
 
@@ -627,21 +830,22 @@ def generate_and_upload_audio(
         return []
 
 
+@functools.lru_cache(maxsize=None)
+def _chunk_split_re(max_len):
+    """One regex pass: pieces of up to max_len chars ending at a space, with
+    over-long words cut at max_len. DOTALL lets a piece span a newline."""
+    return re.compile(
+        rf"\S(?:.{{0,{max_len - 2}}}\S)?(?=\s|$)|\S.{{0,{max_len - 1}}}", re.DOTALL
+    )
+
+
 def validate_and_process_chunk(chunk, max_len=250):
-    cleaned_chunk = re.sub(r"https?://\S+", "", chunk).strip()
+    cleaned_chunk = _URL_RE.sub("", chunk).strip()
     if not cleaned_chunk:
         return []
     if len(cleaned_chunk) <= max_len:
         return [cleaned_chunk]
-    sub_chunks = []
-    while len(cleaned_chunk) > max_len:
-        split_pos = cleaned_chunk.rfind(" ", 0, max_len)
-        if split_pos == -1:
-            split_pos = max_len
-        sub_chunks.append(cleaned_chunk[:split_pos])
-        cleaned_chunk = cleaned_chunk[split_pos:].lstrip()
-    sub_chunks.append(cleaned_chunk)
-    return sub_chunks
+    return _chunk_split_re(max_len).findall(cleaned_chunk)
 
 
 def cleanup(files_to_remove):
@@ -735,7 +939,7 @@ def run_reauth():
 
     logger.info("Starting Google OAuth flow. A browser window will open for sign-in...")
     creds = authenticate_gmail(token_file, credentials_file)
-    gmail_service = build("gmail", "v1", credentials=creds)
+    gmail_service = build_gmail_service(creds)
 
     try:
         profile = _execute_with_retry(
@@ -844,15 +1048,31 @@ Default behavior (when no dates are specified):
 
     try:
         config = load_config()
+        # Load the TTS model while the API and Gmail calls below are in flight.
+        preload_pipeline()
+
+        # The start-up GETs don't depend on each other: the last-upload and
+        # sources requests go out in the background while the auth check runs
+        # here, instead of one RTT after another. Auth is still acted on first.
+        api_url, api_key = config["api_url"], config["api_key"]
+        need_last_upload = not args.start_date and not args.date
+        last_upload_future = (
+            run_in_background("startup-request", find_last_upload_date, api_url, api_key)
+            if need_last_upload
+            else None
+        )
+        sources_future = run_in_background(
+            "startup-request", fetch_sources, api_url, api_key, exit_on_error=False
+        )
 
-        if not verify_authentication(config["api_url"], config["api_key"]):
+        # On failure the background requests are simply abandoned: their
+        # threads are daemons, so exiting doesn't wait on their retries.
+        if not verify_authentication(api_url, api_key):
             sys.exit(1)
 
         # Determine date range based on last upload if not explicitly provided
-        if not args.start_date and not args.date:
-            last_upload_date = find_last_upload_date(
-                config["api_url"], config["api_key"]
-            )
+        if need_last_upload:
+            last_upload_date = last_upload_future.result()
             if last_upload_date:
                 start_date = last_upload_date + datetime.timedelta(days=1)
                 # Ensure end_date is the last one from the initial calculation (yesterday)
@@ -876,15 +1096,20 @@ Default behavior (when no dates are specified):
                 logger.info("No previous uploads found or error determining last upload date. Processing yesterday only.")
                 # dates_to_process already contains yesterday, so no change needed
 
-        sources = fetch_sources(config["api_url"], config["api_key"])
+        try:
+            sources = sources_future.result()
+        except requests.exceptions.RequestException:
+            logger.error(f"A network error occurred calling {api_url}/sources", exc_info=True)
+            sys.exit(1)
         if not sources:
             logger.info("No sources returned from API. Exiting.")
             return
+        senders = build_sender_index(sources)
 
         gmail_creds = authenticate_gmail(
             config["token_file"], config["credentials_file"]
         )
-        gmail_service = build("gmail", "v1", credentials=gmail_creds)
+        gmail_service = build_gmail_service(gmail_creds)
 
         for process_date in dates_to_process:
             date_str = process_date.strftime("%Y-%m-%d")
@@ -901,7 +1126,7 @@ Default behavior (when no dates are specified):
                     continue
 
                 full_text, text_blocks = process_emails_and_raw_content(
-                    gmail_service, sources, date_str
+                    gmail_service, sources, date_str, senders=senders, creds=gmail_creds
                 )
 
                 if not full_text.strip():
@@ -914,8 +1139,14 @@ Default behavior (when no dates are specified):
                 for block in text_blocks:
                     block["text"] = remove_markdown_links(block["text"])
 
+                # On a multi-date backfill, keep the model loaded between
+                # dates; the last date frees it before its upload.
                 files_created = generate_and_upload_audio(
-                    cleaned_full_text, text_blocks, config, date_str
+                    cleaned_full_text,
+                    text_blocks,
+                    config,
+                    date_str,
+                    keep_pipeline=process_date != dates_to_process[-1],
                 )
 
                 if not mp3_filepath_generated:
@@ -2,10 +2,13 @@ import pytest
 import os
 import configparser
 import json
+import math
 import base64
 import logging
 import datetime
 import subprocess
+import threading
+from email.message import EmailMessage
 from unittest.mock import MagicMock, patch, mock_open, ANY, call
 from pathlib import Path
 import requests
@@ -42,6 +45,19 @@ def prevent_sys_exit(monkeypatch):
     monkeypatch.setattr(ga.sys, "exit", lambda x: (_ for _ in ()).throw(SystemExit(x)))
 
 
+def _raw_message(msg_id, label_ids, sender, subject, body, subtype="plain"):
+    """Build a Gmail format="raw" message resource around an RFC 822 email."""
+    em = EmailMessage()
+    em["From"] = sender
+    em["Subject"] = subject
+    em.set_content(body, subtype=subtype)
+    return {
+        "id": msg_id,
+        "labelIds": label_ids,
+        "raw": base64.urlsafe_b64encode(em.as_bytes()).decode("ascii"),
+    }
+
+
 @pytest.fixture
 def mock_email_data():
     """Provides mock email data for parsing tests, including UNREAD status."""
@@ -49,62 +65,61 @@ def mock_email_data():
     html_content = "<h1>Hello</h1><p>This is an HTML newsletter.</p>"
 
     # Message 1 is UNREAD
-    mock_msg_1 = {
-        "id": "msg1",
-        "labelIds": ["INBOX", "UNREAD"],
-        "payload": {
-            "headers": [
-                {"name": "From", "value": "Test Sender 1 <sender1@example.com>"},
-                {"name": "Subject", "value": "Unread Email"},
-            ],
-            "parts": [
-                {
-                    "mimeType": "text/plain",
-                    "body": {
-                        "data": base64.urlsafe_b64encode(
-                            text_content.encode("utf-8")
-                        ).decode("ascii")
-                    },
-                }
-            ],
-        },
-    }
+    mock_msg_1 = _raw_message(
+        "msg1",
+        ["INBOX", "UNREAD"],
+        "Test Sender 1 <sender1@example.com>",
+        "Unread Email",
+        text_content,
+    )
 
     # Message 2 is already read (no UNREAD label)
-    mock_msg_2 = {
-        "id": "msg2",
-        "labelIds": ["INBOX"],
-        "payload": {
-            "headers": [
-                {"name": "From", "value": "Test Sender 2 <sender2@example.com>"},
-                {"name": "Subject", "value": "Read Email"},
-            ],
-            "parts": [
-                {
-                    "mimeType": "text/html",
-                    "body": {
-                        "data": base64.urlsafe_b64encode(
-                            html_content.encode("utf-8")
-                        ).decode("ascii")
-                    },
-                }
-            ],
-        },
-    }
+    mock_msg_2 = _raw_message(
+        "msg2",
+        ["INBOX"],
+        "Test Sender 2 <sender2@example.com>",
+        "Read Email",
+        html_content,
+        subtype="html",
+    )
 
-    # Malformed message to test error handling
+    # Malformed message to test error handling: the body declares a charset
+    # that cannot be decoded.
+    malformed_raw = (
+        b"From: Bad Sender <sender3@example.com>\r\n"
+        b"Content-Type: text/plain; charset=not-a-charset\r\n"
+        b"\r\n"
+        b"body\r\n"
+    )
     malformed_msg = {
         "id": "msg3",
         "labelIds": ["INBOX"],
-        "payload": {
-            "headers": [{"name": "From", "value": "Bad Sender <sender3@example.com>"}],
-            "parts": [{"mimeType": "text/plain", "body": {"data": "not-base64"}}],
-        },
+        "raw": base64.urlsafe_b64encode(malformed_raw).decode("ascii"),
     }
 
     return [mock_msg_1, mock_msg_2, malformed_msg]
 
 
+class FakeBatch:
+    """Stand-in for BatchHttpRequest that runs each queued request on execute()."""
+
+    def __init__(self, callback=None):
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        self._requests.append((request, callback or self._callback, request_id))
+
+    def execute(self):
+        for request, callback, request_id in self._requests:
+            try:
+                response = request.execute()
+            except Exception as exc:
+                callback(request_id, None, exc)
+            else:
+                callback(request_id, response, None)
+
+
 # --- Test Classes ---
 
 
@@ -117,6 +132,8 @@ class TestConfigAndSetup:
         assert config["credentials_file"] == str(config_dir / "fake_credentials.json")
         assert config["token_file"] == str(config_dir / "fake_token.json")
         assert config["reference_voice_file"] == str(config_dir / "path/to/fake_voice.wav")
+        with pytest.raises(TypeError):
+            config["api_url"] = "https://elsewhere.example"
 
     def test_load_config_preserves_absolute_paths(self, tmp_path):
         config = configparser.ConfigParser()
@@ -168,6 +185,17 @@ class TestConfigAndSetup:
 
 
 class TestApiInteractions:
+    def test_verify_authentication_uses_shared_session(self, mocker):
+        mock_get = mocker.patch.object(
+            ga._SESSION, "get", return_value=MagicMock(status_code=200)
+        )
+        assert ga.verify_authentication("https://fake-api.com", "key") is True
+        mock_get.assert_called_once_with(
+            "https://fake-api.com/sources",
+            headers={"Authorization": "Bearer key"},
+            timeout=15,
+        )
+
     def test_fetch_sources_success(self, requests_mock):
         requests_mock.get(
             "https://fake-api.com/sources", json=[{"sender_email": "test@example.com"}]
@@ -175,6 +203,17 @@ class TestApiInteractions:
         sources = ga.fetch_sources("https://fake-api.com", "fake_key")
         assert sources == [{"sender_email": "test@example.com"}]
 
+    def test_fetch_sources_invalid_json_exits(self, requests_mock):
+        requests_mock.get("https://fake-api.com/sources", text="<html>oops</html>")
+        with pytest.raises(SystemExit):
+            ga.fetch_sources("https://fake-api.com", "fake_key")
+
+    def test_fetch_sources_raises_when_not_exiting(self, requests_mock, caplog):
+        requests_mock.get("https://fake-api.com/sources", status_code=401)
+        with caplog.at_level(logging.ERROR), pytest.raises(requests.exceptions.HTTPError):
+            ga.fetch_sources("https://fake-api.com", "fake_key", exit_on_error=False)
+        assert caplog.text == ""
+
     def test_fetch_sources_http_error(self, requests_mock, caplog):
         requests_mock.get(
             "https://fake-api.com/sources", status_code=500, text="Server Error"
@@ -292,11 +331,21 @@ class TestApiInteractions:
         )
 
 
+class TestHttpSession:
+    def test_session_retries_gateway_errors(self):
+        retry = ga._SESSION.get_adapter("https://fake-api.com").max_retries
+        assert set(retry.status_forcelist) == {502, 503, 504}
+        assert retry.connect == 0  # connection errors: _requests_get_with_retry
+        assert retry.raise_on_status is False
+
+
 class TestGmailInteraction:
     @pytest.fixture
     def mock_gmail_service(self):
         """A basic mock for the gmail service."""
-        return MagicMock()
+        service = MagicMock()
+        service.new_batch_http_request.side_effect = FakeBatch
+        return service
 
     @patch("generate_audiobook.os.path.exists", side_effect=[False, False])
     @patch("generate_audiobook.Credentials.from_authorized_user_file")
@@ -333,19 +382,28 @@ class TestGmailInteraction:
         )
 
         # Test text processing
-        assert "HelloThis is an HTML newsletter." in full_text
+        assert "Hello This is an HTML newsletter." in full_text
         assert "This is a plain text newsletter." in full_text
         assert full_text.startswith("\n\nNewsletter from: Newsletter Two.")
         assert len(text_blocks) == 2
 
-        # Test that modify() was called to mark the email as read
-        mock_modify_call = mock_gmail_service.users().messages().modify
+        # Test that batchModify() was called to mark the email as read
+        mock_modify_call = mock_gmail_service.users().messages().batchModify
 
         # It should be called exactly once, for msg1 which was UNREAD.
         mock_modify_call.assert_called_once_with(
-            userId="me", id="msg1", body={"removeLabelIds": ["UNREAD"]}
+            userId="me", body={"ids": ["msg1"], "removeLabelIds": ["UNREAD"]}
         )
 
+    def test_build_sender_index(self):
+        sources = [
+            {"sender_email": "A@Example.com", "custom_name": "Alpha"},
+            {"sender_email": "b@example.com", "custom_name": "Beta"},
+        ]
+        query, names = ga.build_sender_index(sources)
+        assert query == "from:A@Example.com OR from:b@example.com"
+        assert names == {"a@example.com": "Alpha", "b@example.com": "Beta"}
+
     def test_process_emails_with_parsing_error(
         self, mock_gmail_service, mock_email_data, caplog
     ):
@@ -376,8 +434,227 @@ class TestGmailInteraction:
         assert full_text == ""
         assert text_blocks == []
 
+    def test_process_emails_batches_message_fetches(
+        self, mock_gmail_service, mock_email_data
+    ):
+        """Message gets are grouped into batches of at most GMAIL_BATCH_SIZE."""
+        mock_gmail_service.users().messages().list().execute.return_value = {
+            "messages": [{"id": f"m{i}"} for i in range(150)]
+        }
+        mock_gmail_service.users().messages().get().execute.return_value = (
+            mock_email_data[1]
+        )
+        sources = [
+            {"sender_email": "sender2@example.com", "custom_name": "Newsletter Two"}
+        ]
+
+        _, text_blocks = ga.process_emails(mock_gmail_service, sources, "2023-10-27")
+
+        assert mock_gmail_service.new_batch_http_request.call_count == math.ceil(
+            150 / ga.GMAIL_BATCH_SIZE
+        )
+        assert ga.GMAIL_BATCH_SIZE <= 50
+        assert len(text_blocks) == 150
+        get_kwargs = mock_gmail_service.users().messages().get.call_args[1]
+        assert get_kwargs["format"] == "raw"
+        assert get_kwargs["fields"] == ga.GMAIL_MESSAGE_FIELDS
+
+    def test_process_emails_skips_failed_fetch(
+        self, mock_gmail_service, mock_email_data, caplog
+    ):
+        mock_gmail_service.users().messages().list().execute.return_value = {
+            "messages": [{"id": "msg1"}, {"id": "msg2"}]
+        }
+        # Reversed order: msg2 is fetched first and fails, in the batch and
+        # again when retried on its own.
+        mock_gmail_service.users().messages().get().execute.side_effect = [
+            HttpError(resp=MagicMock(status=404), content=b"Not Found"),
+            mock_email_data[0],
+            HttpError(resp=MagicMock(status=404), content=b"Not Found"),
+        ]
+        sources = [
+            {"sender_email": "sender1@example.com", "custom_name": "Newsletter One"}
+        ]
+
+        with caplog.at_level(logging.ERROR):
+            _, text_blocks = ga.process_emails(
+                mock_gmail_service, sources, "2023-10-27"
+            )
+
+        assert [b["title"] for b in text_blocks] == ["Newsletter One"]
+        assert "Failed to fetch email msg2" in caplog.text
+
+    def test_process_emails_retries_rate_limited_batch_parts(
+        self, mock_gmail_service, mock_email_data, mocker
+    ):
+        mocker.patch("generate_audiobook.time.sleep")
+        mock_gmail_service.users().messages().list().execute.return_value = {
+            "messages": [{"id": "msg1"}, {"id": "msg2"}]
+        }
+        rate_limited = HttpError(resp=MagicMock(status=429), content=b"rateLimitExceeded")
+        # msg2 gets a 429 inside the batch, then once more on its own retry.
+        mock_gmail_service.users().messages().get().execute.side_effect = [
+            rate_limited,
+            mock_email_data[0],
+            rate_limited,
+            mock_email_data[1],
+        ]
+        sources = [
+            {"sender_email": "sender1@example.com", "custom_name": "Newsletter One"},
+            {"sender_email": "sender2@example.com", "custom_name": "Newsletter Two"},
+        ]
+
+        _, text_blocks = ga.process_emails(mock_gmail_service, sources, "2023-10-27")
+
+        assert [b["title"] for b in text_blocks] == ["Newsletter Two", "Newsletter One"]
+
+    def test_process_emails_falls_back_when_batch_fails(
+        self, mock_gmail_service, mock_email_data, caplog
+    ):
+        failing_batch = MagicMock()
+        failing_batch.execute.side_effect = HttpError(
+            resp=MagicMock(status=500), content=b"Batch error"
+        )
+        mock_gmail_service.new_batch_http_request.side_effect = None
+        mock_gmail_service.new_batch_http_request.return_value = failing_batch
+        mock_gmail_service.users().messages().list().execute.return_value = {
+            "messages": [{"id": "msg1"}]
+        }
+        mock_gmail_service.users().messages().get().execute.return_value = (
+            mock_email_data[0]
+        )
+        sources = [
+            {"sender_email": "sender1@example.com", "custom_name": "Newsletter One"}
+        ]
+
+        creds = MagicMock()
+
+        with caplog.at_level(logging.WARNING), patch(
+            "generate_audiobook.AuthorizedHttp"
+        ) as mock_authorized_http:
+            _, text_blocks = ga.process_emails(
+                mock_gmail_service, sources, "2023-10-27", creds=creds
+            )
+
+        assert [b["title"] for b in text_blocks] == ["Newsletter One"]
+        assert "Falling back to individual requests" in caplog.text
+        # Each fallback worker thread executes with its own authorized Http.
+        assert mock_authorized_http.call_args[0][0] is creds
+        execute_kwargs = mock_gmail_service.users().messages().get().execute.call_args[1]
+        assert execute_kwargs["http"] is mock_authorized_http.return_value
+
+    def test_process_emails_fallback_without_creds_uses_service_http(
+        self, mock_gmail_service, mock_email_data
+    ):
+        failing_batch = MagicMock()
+        failing_batch.execute.side_effect = HttpError(
+            resp=MagicMock(status=500), content=b"Batch error"
+        )
+        mock_gmail_service.new_batch_http_request.side_effect = None
+        mock_gmail_service.new_batch_http_request.return_value = failing_batch
+        mock_gmail_service.users().messages().list().execute.return_value = {
+            "messages": [{"id": "msg1"}]
+        }
+        mock_gmail_service.users().messages().get().execute.return_value = (
+            mock_email_data[0]
+        )
+        sources = [
+            {"sender_email": "sender1@example.com", "custom_name": "Newsletter One"}
+        ]
+
+        _, text_blocks = ga.process_emails(mock_gmail_service, sources, "2023-10-27")
+
+        assert [b["title"] for b in text_blocks] == ["Newsletter One"]
+        mock_gmail_service.users().messages().get().execute.assert_called_with()
+
+    def test_process_emails_preserves_message_order(
+        self, mock_gmail_service, mock_email_data
+    ):
+        """Parsing runs in a thread pool but blocks keep the fetch order."""
+        mock_gmail_service.users().messages().list().execute.return_value = {
+            "messages": [{"id": "msg2"}, {"id": "msg1"}]
+        }
+        mock_gmail_service.users().messages().get().execute.side_effect = [
+            mock_email_data[0],
+            mock_email_data[1],
+        ]
+        sources = [
+            {"sender_email": "sender1@example.com", "custom_name": "Newsletter One"},
+            {"sender_email": "sender2@example.com", "custom_name": "Newsletter Two"},
+        ]
+
+        _, text_blocks = ga.process_emails(mock_gmail_service, sources, "2023-10-27")
+
+        assert [b["title"] for b in text_blocks] == ["Newsletter One", "Newsletter Two"]
+
+    def test_process_emails_prefers_plain_part_of_multipart(self, mock_gmail_service):
+        em = EmailMessage()
+        em["From"] = "Sender <sender@example.com>"
+        em.set_content("Plain body.")
+        em.add_alternative("<p>HTML body.</p>", subtype="html")
+        mock_gmail_service.users().messages().list().execute.return_value = {
+            "messages": [{"id": "m1"}]
+        }
+        mock_gmail_service.users().messages().get().execute.return_value = {
+            "id": "m1",
+            "labelIds": ["INBOX"],
+            "raw": base64.urlsafe_b64encode(em.as_bytes()).decode("ascii"),
+        }
+        sources = [{"sender_email": "sender@example.com", "custom_name": "Multi"}]
+
+        full_text, _ = ga.process_emails(mock_gmail_service, sources, "2023-10-27")
+
+        assert "Plain body." in full_text
+        assert "HTML body." not in full_text
+
 
 class TestHelperFunctions:
+    def test_html_to_text_decodes_entities_and_collapses_whitespace(self):
+        html = "<div><h1>News</h1>\n\n<p>Tom &amp; Jerry&nbsp;return.</p></div>"
+        assert ga._html_to_text(html) == "News Tom & Jerry return."
+
+    def test_html_to_text_skips_script_and_style(self):
+        html = (
+            "<html><head><style>p { color: red; }</style></head><body>"
+            "<script>track('open');</script><p>Readable text.</p></body></html>"
+        )
+        assert ga._html_to_text(html) == "Readable text."
+
+    def test_html_to_text_lxml_fallback_skips_script(self, monkeypatch):
+        monkeypatch.setattr(ga, "HTMLParser", None)
+        html = "<div><script>var x = 1;</script><p>Only &amp; this.</p></div>"
+        assert ga._html_to_text(html) == "Only & this."
+
+    def test_html_to_text_regex_fallback_without_parsers(self, monkeypatch):
+        monkeypatch.setattr(ga, "HTMLParser", None)
+        monkeypatch.setattr(ga, "lxml_html", None)
+        html = (
+            "<style>p { color: red; }</style><h1>News</h1><p>Tom &amp; "
+            "<b>Jerry</b>&nbsp;return.</p><SCRIPT>track();</SCRIPT>"
+        )
+        assert ga._html_to_text(html) == "News Tom & Jerry return."
+
+    def test_drop_repeated_footers_trims_later_copies(self):
+        footer = (
+            "You received this email because you subscribed to our list. "
+            "Unsubscribe at any time from your account settings page."
+        )
+        blocks = [
+            {"title": "One", "text": f"\n\nNewsletter from: One.\n\nFirst story. {footer}"},
+            {"title": "Two", "text": f"\n\nNewsletter from: Two.\n\nSecond story. {footer}"},
+        ]
+        ga._drop_repeated_footers(blocks)
+        assert blocks[0]["text"].endswith(footer)
+        assert blocks[1]["text"] == "\n\nNewsletter from: Two.\n\nSecond story."
+
+    def test_drop_repeated_footers_keeps_short_repeats(self):
+        blocks = [
+            {"title": "One", "text": "\n\nNewsletter from: One.\n\nStory one. Thanks!"},
+            {"title": "Two", "text": "\n\nNewsletter from: Two.\n\nStory two. Thanks!"},
+        ]
+        ga._drop_repeated_footers(blocks)
+        assert blocks[1]["text"].endswith("Thanks!")
+
     def test_remove_markdown_links(self):
         text = "Check [this link](http://a.com) and [another one](http://b.com)."
         expected = "Check this link and another one."
@@ -401,6 +678,10 @@ class TestHelperFunctions:
         for sub_chunk in result:
             assert len(sub_chunk) <= max_len
 
+    def test_validate_and_process_chunk_spans_newlines(self):
+        assert ga.validate_and_process_chunk("aa\nbb cc", max_len=6) == ["aa\nbb", "cc"]
+        assert ga.validate_and_process_chunk("abc\ndefgh", max_len=4) == ["abc", "defg", "h"]
+
 
 class TestAudioAndMetadata:
     def test__create_chapter_list(self):
@@ -476,6 +757,7 @@ class TestAudioAndMetadata:
         expected_mp3 = os.path.join(
             ga.ARCHIVE_FOLDER, "digest_2023-01-01_cleaned_generated_audio.mp3"
         )
+        mock_tts.return_value = (Path(expected_mp3), [2.0])
 
         with caplog.at_level(logging.INFO):
             files = ga.generate_and_upload_audio(
@@ -483,13 +765,26 @@ class TestAudioAndMetadata:
             )
 
         mock_save.assert_called_once_with("some text", "2023-01-01")
-        mock_tts.assert_called_once_with("some text", expected_mp3)
+        mock_tts.assert_called_once_with(["t"], expected_mp3, keep_pipeline=False)
         mock_upload.assert_called_once_with(
             expected_mp3, config, "2023-01-01", text_blocks
         )
         assert files == [expected_mp3]
         assert "Audio generation and upload completed successfully" in caplog.text
 
+    @patch("generate_audiobook.upload_audio", return_value=True)
+    @patch("generate_audiobook.generate_audio_from_text")
+    @patch("generate_audiobook.save_cleaned_text")
+    def test_generate_and_upload_audio_records_block_durations(
+        self, mock_save, mock_tts, mock_upload
+    ):
+        mock_tts.return_value = (Path("digest.mp3"), [1.5, 4.0])
+        text_blocks = [{"title": "a", "text": "a"}, {"title": "b", "text": "b"}]
+
+        ga.generate_and_upload_audio("a b", text_blocks, {}, "2023-01-01")
+
+        assert [b["duration_s"] for b in text_blocks] == [1.5, 4.0]
+
     @patch("generate_audiobook.upload_audio")
     @patch(
         "generate_audiobook.generate_audio_from_text",
@@ -518,6 +813,7 @@ class TestAudioAndMetadata:
         self, mock_save, mock_tts, mock_upload, caplog
     ):
         mock_save.return_value = "/path/to/text.txt"
+        mock_tts.return_value = (Path("digest.mp3"), [1.0])
         mock_upload.return_value = False
         config = {"api_url": "url", "api_key": "key"}
 
@@ -535,6 +831,7 @@ class TestMainExecution:
     def mock_main_dependencies(self, mocker):
         """Mock all external dependencies for main function."""
         mocker.patch("generate_audiobook.setup_logging")
+        mocker.patch("generate_audiobook.preload_pipeline")
         mocker.patch(
             "generate_audiobook.load_config",
             return_value={
@@ -546,8 +843,11 @@ class TestMainExecution:
             },
         )
         mocker.patch("generate_audiobook.verify_authentication", return_value=True)
-        mocker.patch("generate_audiobook.fetch_sources", return_value=[{"id": 1}])
-        mocker.patch("generate_audiobook.authenticate_gmail")
+        mocker.patch(
+            "generate_audiobook.fetch_sources",
+            return_value=[{"id": 1, "sender_email": "a@example.com", "custom_name": "A"}],
+        )
+        self.mock_auth = mocker.patch("generate_audiobook.authenticate_gmail")
         mocker.patch("googleapiclient.discovery.build")
         self.mock_process_content = mocker.patch(
             "generate_audiobook.process_emails_and_raw_content",
@@ -591,6 +891,10 @@ class TestMainExecution:
             assert self.mock_gen_upload.call_args_list[i].args[3] == expected_date
             assert self.mock_cleanup.call_args_list[i].args[0] == ["file1.mp3"]
 
+        # The TTS model stays loaded between dates and is freed after the last.
+        keep = [c.kwargs["keep_pipeline"] for c in self.mock_gen_upload.call_args_list]
+        assert keep == [True] * (len(expected_dates) - 1) + [False]
+
     def test_main_skips_existing_audiobook(self, monkeypatch, caplog):
         """Test that main skips processing when an audiobook already exists."""
         monkeypatch.setattr(ga.sys, "argv", ["script", "--date", "2023-05-10"])
@@ -611,7 +915,9 @@ class TestMainExecution:
         monkeypatch.setattr(ga.sys, "argv", ["script", "--date", "2023-05-10"])
         self.mock_process_content.return_value = ("  ", [])
         ga.main()
-        self.mock_process_content.assert_called_once_with(ANY, ANY, "2023-05-10")
+        self.mock_process_content.assert_called_once_with(
+            ANY, ANY, "2023-05-10", senders=ANY, creds=self.mock_auth.return_value
+        )
         self.mock_gen_upload.assert_not_called()
 
     def test_main_invalid_date_format(self, monkeypatch, caplog):
@@ -654,8 +960,12 @@ class TestMainExecution:
             self.mock_check_existing.call_args_list[1].args[2]
             == "Daily Digest for 2023-05-11"
         )
-        self.mock_process_content.assert_called_once_with(ANY, ANY, "2023-05-11")
-        self.mock_gen_upload.assert_called_once_with(ANY, ANY, ANY, "2023-05-11")
+        self.mock_process_content.assert_called_once_with(
+            ANY, ANY, "2023-05-11", senders=ANY, creds=self.mock_auth.return_value
+        )
+        self.mock_gen_upload.assert_called_once_with(
+            ANY, ANY, ANY, "2023-05-11", keep_pipeline=False
+        )
 
         assert "Skipping 2023-05-10 - audiobook already exists." in caplog.text
 
@@ -1095,6 +1405,24 @@ class TestAdditionalGmailCoverage:
         m_flow.assert_called_once_with("creds.json", ga.SCOPES)
         assert result == mock_new_creds
 
+    @patch("generate_audiobook.build")
+    def test_build_gmail_service_uses_bundled_discovery(self, m_build):
+        creds = MagicMock()
+        assert ga.build_gmail_service(creds) is m_build.return_value
+        m_build.assert_called_once_with(
+            "gmail",
+            "v1",
+            credentials=creds,
+            static_discovery=True,
+            cache_discovery=False,
+            model=ANY,
+        )
+
+    def test_orjson_model_parses_like_json_model(self):
+        model = ga._OrjsonModel()
+        assert model.deserialize(b'{"id": "m1", "raw": "YQ"}') == {"id": "m1", "raw": "YQ"}
+        assert model.deserialize(b"not json") == "not json"
+
     def test_process_emails_empty_sources(self):
         """Empty sources list should return early."""
         full_text, text_blocks = ga.process_emails(MagicMock(), [], "2023-10-27")
@@ -1122,29 +1450,16 @@ class TestAdditionalGmailCoverage:
         mock_service.users().messages().list().execute.return_value = {
             "messages": [{"id": "msg1"}]
         }
-        text_content = "Newsletter content"
-        mock_msg = {
-            "id": "msg1",
-            "labelIds": ["INBOX", "UNREAD"],
-            "payload": {
-                "headers": [
-                    {"name": "From", "value": "Sender <sender@example.com>"},
-                    {"name": "Subject", "value": "Test Subject"},
-                ],
-                "parts": [
-                    {
-                        "mimeType": "text/plain",
-                        "body": {
-                            "data": base64.urlsafe_b64encode(
-                                text_content.encode("utf-8")
-                            ).decode("ascii")
-                        },
-                    }
-                ],
-            },
-        }
+        mock_service.new_batch_http_request.side_effect = FakeBatch
+        mock_msg = _raw_message(
+            "msg1",
+            ["INBOX", "UNREAD"],
+            "Sender <sender@example.com>",
+            "Test Subject",
+            "Newsletter content",
+        )
         mock_service.users().messages().get().execute.return_value = mock_msg
-        mock_service.users().messages().modify().execute.side_effect = HttpError(
+        mock_service.users().messages().batchModify().execute.side_effect = HttpError(
             resp=MagicMock(status=500), content=b"Error"
         )
         sources = [{"sender_email": "sender@example.com", "custom_name": "Test"}]
@@ -1153,7 +1468,7 @@ class TestAdditionalGmailCoverage:
             full_text, text_blocks = ga.process_emails(mock_service, sources, "2023-10-27")
 
         assert "Newsletter content" in full_text
-        assert "Could not mark email msg1 as read" in caplog.text
+        assert "Could not mark emails msg1 as read" in caplog.text
 
 
 class TestAdditionalCleanupCoverage:
@@ -1187,6 +1502,7 @@ class TestMainDefaultDateLogic:
     @pytest.fixture(autouse=True)
     def mock_main_deps(self, mocker):
         mocker.patch("generate_audiobook.setup_logging")
+        mocker.patch("generate_audiobook.preload_pipeline")
         mocker.patch(
             "generate_audiobook.load_config",
             return_value={
@@ -1198,7 +1514,10 @@ class TestMainDefaultDateLogic:
             },
         )
         mocker.patch("generate_audiobook.verify_authentication", return_value=True)
-        mocker.patch("generate_audiobook.fetch_sources", return_value=[{"id": 1}])
+        mocker.patch(
+            "generate_audiobook.fetch_sources",
+            return_value=[{"id": 1, "sender_email": "a@example.com", "custom_name": "A"}],
+        )
         mocker.patch("generate_audiobook.authenticate_gmail")
         mocker.patch("googleapiclient.discovery.build")
         self.mock_process_content = mocker.patch(
@@ -1254,6 +1573,7 @@ class TestMainEdgeCases:
     @pytest.fixture(autouse=True)
     def mock_main_deps(self, mocker):
         mocker.patch("generate_audiobook.setup_logging")
+        mocker.patch("generate_audiobook.preload_pipeline")
         self.mock_load_config = mocker.patch(
             "generate_audiobook.load_config",
             return_value={
@@ -1290,6 +1610,37 @@ class TestMainEdgeCases:
         with pytest.raises(SystemExit):
             ga.main()
 
+    def test_startup_requests_run_concurrently(self, monkeypatch):
+        monkeypatch.setattr(ga.sys, "argv", ["script", "--date", "2023-05-10"])
+        # Each call waits for the other; run one after the other, they'd time out.
+        barrier = threading.Barrier(2, timeout=5)
+
+        def verify(*args):
+            barrier.wait()
+            return True
+
+        def sources(*args, **kwargs):
+            barrier.wait()
+            return []
+
+        self.mock_verify_auth.side_effect = verify
+        self.mock_fetch_sources.side_effect = sources
+
+        ga.main()
+
+        self.mock_fetch_sources.assert_called_once_with("url", "key", exit_on_error=False)
+
+    def test_sources_error_exits_after_auth(self, monkeypatch, caplog):
+        monkeypatch.setattr(ga.sys, "argv", ["script", "--date", "2023-05-10"])
+        self.mock_verify_auth.return_value = True
+        self.mock_fetch_sources.side_effect = requests.exceptions.ConnectionError("down")
+
+        with caplog.at_level(logging.ERROR), pytest.raises(SystemExit) as exc_info:
+            ga.main()
+
+        assert exc_info.value.code == 1
+        assert "A network error occurred calling url/sources" in caplog.text
+
     def test_no_sources(self, monkeypatch, caplog):
         monkeypatch.setattr(ga.sys, "argv", ["script", "--date", "2023-05-10"])
         self.mock_verify_auth.return_value = True
@@ -7,8 +7,10 @@ notebook (`TTS_Generation_Colab.ipynb`) so the full pipeline can run end-to-end
 on a CPU server with no manual upload/download handoff.
 
 Public API:
-    generate_audio_from_text(text, output_mp3_path, ...) -> Path
+    generate_audio_from_text(text, output_mp3_path, ...) -> (Path, block durations)
     generate_audio_from_file(text_file_path, output_dir, ...) -> Path
+    preload_pipeline(device, engine) -> Future
+    run_in_background(name, fn, *args, **kwargs) -> Future
 
 CLI:
     python generate_tts_audio.py path/to/digest.txt
@@ -22,68 +24,119 @@ System dependency:
 from __future__ import annotations
 
 import argparse
+import contextlib
+import functools
+import gc
+import inspect
+import json
 import logging
+import os
 import re
+import subprocess
 import sys
+import threading
 import time
+import weakref
+from concurrent.futures import Future
 from pathlib import Path
-from typing import List, Union
+from typing import List, Sequence, Tuple, Union
+
+# Kokoro runs many small ops per frame, and an OpenMP/MKL pool sized to every
+# core mostly adds contention. The pools are sized when numpy/torch first load,
+# so this has to come before those imports. Export the variables to override.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+# Batch lengths vary from call to call; expandable segments let the CUDA
+# caching allocator grow one mapping instead of fragmenting into many
+# odd-sized blocks over a long run. Read when CUDA first initializes; not
+# supported on Windows, where torch would only warn about it.
+if sys.platform != "win32":
+    os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
 
 import numpy as np
 import soundfile as sf
-from pydub import AudioSegment
 from tqdm.auto import tqdm
-import torch # Import torch for no_grad
+import torch
+
+try:
+    import imageio_ffmpeg
+except ImportError:  # pragma: no cover
+    imageio_ffmpeg = None
+
+try:
+    import onnxruntime
+except ImportError:  # pragma: no cover
+    onnxruntime = None
 
 logger = logging.getLogger(__name__)
 
 # Kokoro TTS configuration
 DEFAULT_VOICE = "af_heart"
 LANG_CODE = "a"  # American English
+REPO_ID = "hexgrad/Kokoro-82M"
+# Inductor's compiled-graph cache lives here so a daily run can reuse the
+# previous day's kernels instead of recompiling from scratch.
+COMPILE_CACHE_DIR = Path.home() / ".cache" / "audio-digest-hub" / "torchinductor"
+# The onnx engine exports the model here on first use and reuses it after.
+ONNX_MODEL_PATH = Path.home() / ".cache" / "audio-digest-hub" / "onnx" / "kokoro-v1_0.onnx"
+ENGINES = ("torch", "onnx")
+# Autocast dtype for synthesis. "auto" is BF16 (or FP16) on CUDA and FP32 on CPU.
+PRECISIONS = ("auto", "fp32", "fp16", "bf16")
 SAMPLE_RATE = 24000  # Kokoro outputs at 24 kHz
 MAX_CHUNK_LENGTH = 250
 DEFAULT_BITRATE = "64k"
 
+# Consecutive speech chunks are packed into one pipeline call up to this many
+# characters. Kokoro re-splits its input on the 510-phoneme model context, so
+# a packed batch runs far fewer model forwards than one call per sentence.
+BATCH_CHAR_BUDGET = 500
+
+# Optional ffmpeg pass that collapses any silence longer than 0.6s. It also
+# shortens the Q&A think-pauses below, which is why it's opt-in.
+TRIM_SILENCE_FILTER = "silenceremove=stop_periods=-1:stop_duration=0.6:stop_threshold=-40dB"
+
 # Interrogator Q&A: insert silence after each question line (Q1:, Q2:, ...)
 # so the listener has time to think before the answer is read.
 PAUSE_MARKER = "__PAUSE_10S__"
 PAUSE_DURATION_SECONDS = 10
 QUESTION_LINE_RE = re.compile(r"^Q\d+:")
+_URL_RE = re.compile(r"https?://\S+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
 
 PathLike = Union[str, Path]
 
 
 def _split_into_sentences(text: str) -> List[str]:
-    sentences = re.split(r"(?<=[.!?])\s+", text)
+    sentences = _SENTENCE_END_RE.split(text)
     return [s.strip() for s in sentences if s.strip()]
 
 
+@functools.lru_cache(maxsize=None)
+def _split_re(max_len: int) -> "re.Pattern[str]":
+    # Up to max_len characters ending at a word boundary; a single word
+    # longer than that is cut at max_len. DOTALL lets a piece span a newline.
+    # Compiled once per max_len (in practice there is only one).
+    return re.compile(
+        rf"\S(?:.{{0,{max_len - 2}}}\S)?(?=\s|$)|\S.{{0,{max_len - 1}}}", re.DOTALL
+    )
+
+
 def _validate_and_split_chunk(chunk: str, max_len: int = MAX_CHUNK_LENGTH) -> List[str]:
-    cleaned = re.sub(r"https?://\S+", "", chunk).strip()
+    cleaned = _URL_RE.sub("", chunk).strip()
     if not cleaned:
         return []
     if len(cleaned) <= max_len:
         return [cleaned]
-
-    sub_chunks: List[str] = []
-    while len(cleaned) > max_len:
-        split_pos = cleaned.rfind(" ", 0, max_len)
-        if split_pos == -1:
-            split_pos = max_len
-        sub_chunks.append(cleaned[:split_pos])
-        cleaned = cleaned[split_pos:].lstrip()
-    if cleaned:
-        sub_chunks.append(cleaned)
-    return sub_chunks
+    return _split_re(max_len).findall(cleaned)
 
 
 def _is_question_line(text: str) -> bool:
     return bool(QUESTION_LINE_RE.match(text.strip()))
 
 
-def _process_text(text: str) -> List[str]:
+def _process_block(block: str) -> List[str]:
     initial: List[str] = []
-    for paragraph in text.split("\n"):
+    for paragraph in block.split("\n"):
         if paragraph.strip():
             initial.extend(_split_into_sentences(paragraph))
 
@@ -98,41 +151,502 @@ def _process_text(text: str) -> List[str]:
         result.append(c)
         if _is_question_line(c):
             result.append(PAUSE_MARKER)
+    return result
+
 
-    pauses = result.count(PAUSE_MARKER)
+def _process_blocks(blocks: Sequence[str]) -> List[List[str]]:
+    """Speech chunks for each block, kept per block so audio can be
+    attributed back to the block it came from."""
+    per_block = [_process_block(block) for block in blocks]
+    total = sum(len(chunks) for chunks in per_block)
+    pauses = sum(chunks.count(PAUSE_MARKER) for chunks in per_block)
     logger.info(
         "Prepared %d speech chunks (+ %d pause markers)",
-        len(result) - pauses,
+        total - pauses,
         pauses,
     )
-    return result
+    return per_block
+
+
+def _batch_chunks(chunks: List[str], budget: int = BATCH_CHAR_BUDGET) -> List[List[str]]:
+    """Group consecutive speech chunks into batches of at most `budget`
+    characters. Pause markers always form a batch of their own."""
+    batches: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for chunk in chunks:
+        if chunk == PAUSE_MARKER:
+            if current:
+                batches.append(current)
+                current, size = [], 0
+            batches.append([chunk])
+            continue
+        if current and size + len(chunk) > budget:
+            batches.append(current)
+            current, size = [], 0
+        current.append(chunk)
+        size += len(chunk) + 1  # +1 for the joining space
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _omp_num_threads() -> int:
+    """Intra-op thread count from OMP_NUM_THREADS. OpenMP also accepts
+    nested lists such as "4,2"; the first level is the one that applies.
+    Anything unparsable falls back to 1."""
+    value = os.environ.get("OMP_NUM_THREADS", "").split(",")[0].strip()
+    try:
+        return max(int(value), 1)
+    except ValueError:
+        return 1
+
+
+def _configure_torch(device: str) -> None:
+    if device.startswith("cuda"):
+        # TF32 tensor-core matmuls/convs for whatever autocast leaves in FP32.
+        # set_float32_matmul_precision is the setting torch.compile reads;
+        # "high" is the same switch as matmul.allow_tf32.
+        # cudnn.benchmark stays off: every batch has a different length, so
+        # it would re-benchmark conv algorithms on almost every call.
+        torch.set_float32_matmul_precision("high")
+        torch.backends.cudnn.allow_tf32 = True
+    else:
+        # torch may already have been imported (and sized its pool) by the
+        # time this module loads, so apply the thread count explicitly too.
+        torch.set_num_threads(_omp_num_threads())
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # only settable before the first parallel op in the process
+
+
+def _mmap_torch_load():
+    """Make torch.load memory-map checkpoints inside the block. It has no
+    effect on torch < 2.5, which has no serialization config."""
+    try:
+        from torch.utils.serialization import config as serialization_config
+    except ImportError:  # pragma: no cover
+        return contextlib.nullcontext()
+    return serialization_config.patch({"load.mmap": True})
 
 
 def _load_pipeline(device: str):
     # Lazy import so module-level import doesn't trigger the model download
     # for callers that only want the text-processing helpers.
-    from kokoro import KPipeline
+    from kokoro import KModel, KPipeline
 
     logger.info("Loading Kokoro pipeline (lang=%s, device=%s)...", LANG_CODE, device)
     start = time.time()
-    pipeline = KPipeline(lang_code=LANG_CODE, device=device)
+    # Allocate the modules directly on the target device, rather than on the
+    # CPU followed by a .to(device) copy. KModel still torch.loads its
+    # checkpoint to the CPU first; memory-mapping it means that is the file's
+    # page cache, not a second copy of the weights on the heap.
+    with torch.device(device), _mmap_torch_load():
+        model = KModel(repo_id=REPO_ID).eval()
+    pipeline = KPipeline(lang_code=LANG_CODE, repo_id=REPO_ID, model=model, device=device)
     logger.info("Pipeline loaded in %.1fs", time.time() - start)
     return pipeline
 
 
+class _OnnxKModel:
+    """
+    Stands in for KModel inside KPipeline, running the exported graph in
+    onnxruntime. KPipeline only reads `device` and calls the model with
+    (phonemes, ref_s, speed, return_output).
+    """
+
+    device = torch.device("cpu")  # voice packs stay on the host for ORT
+
+    def __init__(self, session, vocab, context_length):
+        self.session = session
+        self.vocab = vocab
+        self.context_length = context_length
+
+    def __call__(self, phonemes, ref_s, speed=1, return_output=False):
+        from kokoro import KModel
+
+        input_ids = [i for i in map(self.vocab.get, phonemes) if i is not None]
+        if len(input_ids) + 2 > self.context_length:
+            raise ValueError(f"Phoneme sequence too long: {len(input_ids) + 2} > {self.context_length}")
+        waveform, pred_dur = self.session.run(
+            None,
+            {
+                "input_ids": np.array([[0, *input_ids, 0]], dtype=np.int64),
+                "ref_s": ref_s.detach().float().cpu().numpy(),
+                "speed": np.array([speed], dtype=np.float32),
+            },
+        )
+        audio = torch.from_numpy(waveform).squeeze()
+        if not return_output:
+            return audio
+        return KModel.Output(audio=audio, pred_dur=torch.from_numpy(pred_dur))
+
+
+def _export_onnx(onnx_path: Path) -> None:
+    from kokoro import KModel
+    from kokoro.model import KModelForONNX
+
+    logger.info("Exporting Kokoro to ONNX (one-off): %s", onnx_path)
+    onnx_path.parent.mkdir(parents=True, exist_ok=True)
+    # The default decoder runs its STFT on complex tensors, which the
+    # TorchScript exporter can't trace; the real-valued one exports.
+    model = KModelForONNX(KModel(repo_id=REPO_ID, disable_complex=True).eval()).eval()
+    dummy = (
+        torch.randint(1, 100, (1, 64), dtype=torch.long),
+        torch.randn(1, 256),
+        torch.ones(1),
+    )
+    # Write to a temp name first so an interrupted export can't leave a
+    # truncated model behind for the next run to load.
+    tmp_path = onnx_path.with_suffix(".onnx.tmp")
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # torch >= 2.5 can export through dynamo (and will by default in
+        # later releases); the dynamic_axes below are for the TorchScript
+        # exporter.
+        export_kwargs["dynamo"] = False
+    torch.onnx.export(
+        model,
+        dummy,
+        str(tmp_path),
+        input_names=["input_ids", "ref_s", "speed"],
+        output_names=["waveform", "duration"],
+        dynamic_axes={"input_ids": {1: "tokens"}, "waveform": {0: "samples"}, "duration": {0: "tokens"}},
+        opset_version=17,
+        **export_kwargs,
+    )
+    os.replace(tmp_path, onnx_path)
+
+
+def _ort_providers(device: str):
+    available = onnxruntime.get_available_providers()
+    providers = []
+    if device.startswith("cuda") and "CUDAExecutionProvider" in available:
+        device_id = int(device.partition(":")[2] or 0)
+        providers.append(
+            ("CUDAExecutionProvider", {"device_id": device_id, "cudnn_conv_use_max_workspace": "1"})
+        )
+    providers.append("CPUExecutionProvider")
+    return providers
+
+
+def _load_onnx_pipeline(device: str):
+    if onnxruntime is None:
+        raise RuntimeError(
+            "The onnx engine needs onnxruntime (pip install onnxruntime, or onnxruntime-gpu for CUDA)"
+        )
+    from huggingface_hub import hf_hub_download
+    from kokoro import KPipeline
+
+    logger.info("Loading Kokoro ONNX pipeline (lang=%s, device=%s)...", LANG_CODE, device)
+    start = time.time()
+    if not ONNX_MODEL_PATH.is_file():
+        _export_onnx(ONNX_MODEL_PATH)
+    with open(hf_hub_download(repo_id=REPO_ID, filename="config.json"), encoding="utf-8") as f:
+        config = json.load(f)
+    session = onnxruntime.InferenceSession(str(ONNX_MODEL_PATH), providers=_ort_providers(device))
+    pipeline = KPipeline(lang_code=LANG_CODE, repo_id=REPO_ID, model=False)
+    pipeline.model = _OnnxKModel(
+        session, config["vocab"], config["plbert"]["max_position_embeddings"]
+    )
+    logger.info(
+        "ONNX pipeline loaded in %.1fs (providers: %s)", time.time() - start, session.get_providers()
+    )
+    return pipeline
+
+
+# Pipelines being loaded in the background by preload_pipeline, keyed by
+# (device, engine). generate_audio_from_text takes the entry it can use.
+_preloaded: dict = {}
+# Warm-up outcome per live pipeline: the settings it was warmed up with and
+# the autocast dtype that survived the warm-up's fallbacks.
+_warmed: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _build_pipeline(device: str, engine: str):
+    return _load_onnx_pipeline(device) if engine == "onnx" else _load_pipeline(device)
+
+
+def run_in_background(name: str, fn, *args, **kwargs) -> Future:
+    """
+    Run fn on a daemon thread called `name` and return a Future for its
+    result. Unlike a ThreadPoolExecutor worker, the thread doesn't hold up
+    interpreter exit if the caller bails out before reading the result.
+    """
+    future: Future = Future()
+
+    def _run():
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:  # noqa: BLE001 — surfaced via the future
+            future.set_exception(exc)
+
+    threading.Thread(target=_run, name=name, daemon=True).start()
+    return future
+
+
+def preload_pipeline(device: str = "cpu", engine: str = "torch") -> Future:
+    """
+    Start loading the Kokoro pipeline on a background thread. The next
+    generate_audio_from_text call with the same device/engine picks it up, so
+    the model load overlaps whatever network work the caller does first.
+    """
+    key = (device, engine)
+    if key not in _preloaded:
+        # Daemon thread: a run that exits early shouldn't wait for the load.
+        _preloaded[key] = run_in_background("tts-preload", _build_pipeline, device, engine)
+    return _preloaded[key]
+
+
+def _keep_pipeline(pipeline, device: str, engine: str) -> None:
+    """Hand a loaded pipeline to the next generate_audio_from_text call."""
+    future: Future = Future()
+    future.set_result(pipeline)
+    _preloaded[(device, engine)] = future
+
+
+def _take_pipeline(device: str, engine: str):
+    future = _preloaded.pop((device, engine), None)
+    if future is not None:
+        try:
+            return future.result()
+        except Exception as exc:  # noqa: BLE001 — retry in the foreground
+            logger.warning("Background pipeline load failed (%s); loading again", exc)
+    return _build_pipeline(device, engine)
+
+
+# KModel submodules covered by --quantize: the ALBERT text encoder and the
+# LSTM prosody/text stacks. Dynamic quantization only handles Linear/LSTM,
+# and the vocoder is almost entirely convolutions, so it stays FP32.
+QUANTIZED_SUBMODULES = ("bert", "bert_encoder", "predictor", "text_encoder")
+
+
+def _quantize_model(pipeline) -> None:
+    """Swap the front end's Linear/LSTM layers for dynamic int8 versions (CPU)."""
+    try:
+        from torch.ao.quantization import default_dynamic_qconfig, quantize_dynamic
+    except ImportError:  # pragma: no cover
+        logger.warning("This torch build has no torch.ao.quantization; running unquantized")
+        return
+    spec = {name: default_dynamic_qconfig for name in QUANTIZED_SUBMODULES}
+    quantize_dynamic(pipeline.model, spec, dtype=torch.qint8, inplace=True)
+    logger.info("Quantized %s to dynamic int8", ", ".join(QUANTIZED_SUBMODULES))
+
+
+def _compile_model(pipeline):
+    """
+    Wrap the Kokoro vocoder in torch.compile. The decoder is a fixed conv
+    stack that compiles cleanly. The prosody front end has data-dependent
+    durations and would just graph-break. Compiled graphs go to a persistent
+    on-disk cache, so later runs skip recompilation.
+
+    Returns the eager decoder so the caller can restore it if the compiled one
+    fails during warm-up, or None if this torch build can't compile.
+    """
+    if not hasattr(torch, "compile"):  # torch < 2.0
+        logger.warning("torch %s has no torch.compile; running the decoder eagerly", torch.__version__)
+        return None
+    os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(COMPILE_CACHE_DIR))
+    try:
+        import torch._inductor.config as inductor_config
+        import torch._dynamo.config as dynamo_config
+
+        inductor_config.fx_graph_cache = True
+        # A shape that fails to compile mid-run falls back to eager for that
+        # call rather than turning the batch into silence.
+        dynamo_config.suppress_errors = True
+    except ImportError:  # pragma: no cover
+        pass
+
+    model = pipeline.model
+    from torch._dynamo.eval_frame import OptimizedModule
+
+    if isinstance(model.decoder, OptimizedModule):
+        # A pipeline kept from an earlier call is already compiled.
+        return model.decoder._orig_mod
+    eager_decoder = model.decoder
+    # Not "reduce-overhead", even on CUDA: cudagraph trees record a graph for
+    # every new input length, and the decoder length changes with almost every
+    # batch, so the graph pool would keep growing through a run. The AdaIN
+    # layers normalize over time, so inputs can't be padded to a few length
+    # buckets to avoid that.
+    model.decoder = torch.compile(eager_decoder, dynamic=True, mode="default")
+    logger.info("Compiled Kokoro decoder (cache: %s)", os.environ["TORCHINDUCTOR_CACHE_DIR"])
+    return eager_decoder
+
+
+def _local_voice_file(voice: str):
+    """
+    Path to the voice pack on local disk, or None if it has to be fetched.
+    Named voices are looked up in the Hugging Face cache with
+    local_files_only=True. Once a voice has been downloaded, later runs skip
+    the hub round-trip that KPipeline.load_voice would otherwise make.
+    """
+    if voice.endswith(".pt"):
+        return voice if Path(voice).is_file() else None
+    if "," in voice:
+        return None  # blended voices are averaged by KPipeline itself
+    from huggingface_hub import hf_hub_download
+
+    try:
+        return hf_hub_download(
+            repo_id=REPO_ID, filename=f"voices/{voice}.pt", local_files_only=True
+        )
+    except Exception:  # noqa: BLE001 — not cached yet; let KPipeline download it
+        return None
+
+
+def _preload_voice(pipeline, voice: str) -> None:
+    """
+    Load the voice pack once and keep it resident on the model's device.
+    KPipeline calls `load_voice(voice).to(model.device)` for every input;
+    replacing its cached CPU pack with the device copy makes that a no-op.
+    The pack file is memory-mapped rather than read into the heap first. On
+    CUDA it is staged through one pinned host copy so the upload can be
+    asynchronous.
+    """
+    if voice not in pipeline.voices:
+        voice_file = _local_voice_file(voice)
+        if voice_file is not None:
+            pipeline.voices[voice] = torch.load(voice_file, weights_only=True, mmap=True)
+    pack = pipeline.load_voice(voice)
+    device = pipeline.model.device
+    if device.type == "cuda" and pack.device.type == "cpu":
+        # Pinned host memory lets the copy run asynchronously; the first
+        # kernel that reads the pack is queued behind it on the same stream.
+        pack = pack.pin_memory().to(device, non_blocking=True)
+    pipeline.voices[voice] = pack.to(device)
+
+
+def _free_device_memory(device: str) -> None:
+    gc.collect()
+    if device.startswith("cuda") and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def _to_numpy(chunk_audio) -> np.ndarray:
+    # Under autocast the model may hand back bf16/fp16 tensors, which numpy
+    # cannot represent directly.
+    if isinstance(chunk_audio, torch.Tensor):
+        chunk_audio = chunk_audio.detach().float().cpu().numpy()
+    return np.asarray(chunk_audio, dtype=np.float32)
+
+
+def _autocast_dtype(device: str, precision: str):
+    """Resolve a --precision value to an autocast dtype, or None for FP32."""
+    if precision == "fp16":
+        return torch.float16
+    if precision == "bf16":
+        return torch.bfloat16
+    if precision == "auto" and device.startswith("cuda"):
+        return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+    return None
+
+
+def _inference_context(device: str, autocast_dtype=None):
+    """inference_mode for every device, plus autocast when a dtype is given."""
+    stack = contextlib.ExitStack()
+    stack.enter_context(torch.inference_mode())
+    if autocast_dtype is not None:
+        device_type = torch.device(device).type
+        stack.enter_context(torch.autocast(device_type=device_type, dtype=autocast_dtype))
+    return stack
+
+
 def _synthesize_chunk(pipeline, text: str, voice: str, speed: float) -> np.ndarray:
     if text == PAUSE_MARKER:
         return np.zeros(int(SAMPLE_RATE * PAUSE_DURATION_SECONDS), dtype=np.float32)
 
     generator = pipeline(text, voice=voice, speed=speed)
-    audio: List[float] = []
-    for _, _, chunk_audio in generator:
-        audio.extend(chunk_audio)
-    return np.array(audio, dtype=np.float32)
+    audio = [_to_numpy(chunk_audio) for _, _, chunk_audio in generator]
+    if not audio:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(audio)
+
+
+def _synthesize_batch(pipeline, batch: List[str], voice: str, speed: float):
+    """
+    Synthesize a batch of chunks in a single pipeline call. If the packed call
+    fails, fall back to one call per chunk so a single bad chunk only costs its
+    own audio. Returns (audio, failed_chunk_count).
+    """
+    try:
+        return _synthesize_chunk(pipeline, " ".join(batch), voice, speed), 0
+    except Exception as exc:  # noqa: BLE001 — retry chunk by chunk
+        if len(batch) == 1:
+            logger.error("Chunk failed (%s): %.80s", exc, batch[0])
+            return np.zeros(int(SAMPLE_RATE * 0.5), dtype=np.float32), 1
+        logger.warning("Batch of %d chunks failed (%s); retrying individually", len(batch), exc)
+
+    audio_parts: List[np.ndarray] = []
+    failed = 0
+    for chunk in batch:
+        audio, chunk_failed = _synthesize_batch(pipeline, [chunk], voice, speed)
+        audio_parts.append(audio)
+        failed += chunk_failed
+    return np.concatenate(audio_parts), failed
+
+
+def _ffmpeg_exe() -> str:
+    """Prefer the ffmpeg binary bundled with imageio-ffmpeg, else the one on PATH."""
+    if imageio_ffmpeg is not None:
+        try:
+            return imageio_ffmpeg.get_ffmpeg_exe()
+        except RuntimeError:
+            pass
+    return "ffmpeg"
+
+
+def _to_pcm_f32(audio: np.ndarray) -> bytes:
+    """Mono float audio as 32-bit little-endian float PCM bytes. The samples
+    go to LAME as-is, without an extra 16-bit quantization (or a copy, when
+    the array is already contiguous float32)."""
+    return np.ascontiguousarray(audio, dtype="<f4").tobytes()
+
+
+def _open_mp3_encoder(
+    mp3_path: Path, bitrate: str, trim_silence: bool = False
+) -> subprocess.Popen:
+    """
+    Start ffmpeg reading raw float32 PCM on stdin and writing `mp3_path`, so
+    audio can be fed in as it is synthesized and encoding overlaps with TTS.
+    """
+    cmd = [
+        _ffmpeg_exe(),
+        "-y",
+        # Keep stderr quiet: nobody drains it until ffmpeg exits, and a
+        # progress line per frame would eventually fill the pipe and stall.
+        "-hide_banner", "-loglevel", "error", "-nostats",
+        "-f", "f32le",
+        "-ar", str(SAMPLE_RATE),
+        "-ac", "1",
+        "-i", "-",
+    ]
+    if trim_silence:
+        cmd += ["-af", TRIM_SILENCE_FILTER]
+    cmd += [
+        "-codec:a", "libmp3lame",
+        "-b:a", bitrate,
+        str(mp3_path),
+    ]
+    return subprocess.Popen(
+        cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+
+
+def _close_mp3_encoder(encoder: subprocess.Popen) -> None:
+    """Flush stdin and wait for ffmpeg; raise CalledProcessError on failure."""
+    _, stderr = encoder.communicate()
+    if encoder.returncode != 0:
+        raise subprocess.CalledProcessError(
+            encoder.returncode, encoder.args, stderr=stderr
+        )
 
 
 def generate_audio_from_text(
-    text_content: str,
+    text_content: Union[str, Sequence[str]],
     output_mp3_path: PathLike,
     *,
     voice: str = DEFAULT_VOICE,
@@ -140,43 +654,139 @@ def generate_audio_from_text(
     device: str = "cpu",
     bitrate: str = DEFAULT_BITRATE,
     keep_wav: bool = False,
-) -> Path:
+    engine: str = "torch",
+    precision: str = "auto",
+    quantize: bool = False,
+    compile_model: bool = False,
+    trim_silence: bool = False,
+    chunk_size: int = BATCH_CHAR_BUDGET,
+    keep_pipeline: bool = False,
+) -> Tuple[Path, List[float]]:
     """
     Synthesize TTS audio for `text_content` and write it to `output_mp3_path`.
-    Returns the absolute path to the generated MP3.
+    `text_content` may be one string or a sequence of block texts; blocks are
+    split separately so no sentence runs across a block boundary. With
+    `keep_pipeline` the loaded model stays resident for the next call
+    instead of being freed.
+    Returns the absolute path to the generated MP3 and the synthesized length
+    in seconds of each block, in block order (measured before any silence
+    trimming).
     """
-    if not text_content or not text_content.strip():
+    blocks = [text_content] if isinstance(text_content, str) else text_content
+    if not any(block and block.strip() for block in blocks):
         raise ValueError("text_content is empty")
 
     output_mp3_path = Path(output_mp3_path).resolve()
     output_mp3_path.parent.mkdir(parents=True, exist_ok=True)
 
-    chunks = _process_text(text_content)
+    block_chunks = _process_blocks(blocks)
+    chunks = [chunk for per_block in block_chunks for chunk in per_block]
     if not chunks:
         raise ValueError("No valid speech chunks after preprocessing")
 
-    pipeline = _load_pipeline(device)
-
-    logger.info("Warming up model...")
-    _ = _synthesize_chunk(pipeline, "Warm up.", voice, speed)
-
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}")
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}; expected one of {PRECISIONS}")
+    if engine == "onnx" and compile_model:
+        logger.warning("--compile has no effect with the onnx engine; ignoring it")
+        compile_model = False
+    if quantize and (engine == "onnx" or not device.startswith("cpu")):
+        # Dynamic int8 kernels are CPU-only; CUDA has --precision instead.
+        logger.warning("--quantize only applies to the torch engine on CPU; ignoring it")
+        quantize = False
+
+    _configure_torch(device)
+    pipeline = _take_pipeline(device, engine)
+    # onnxruntime runs the exported FP32 graph; autocast only affects torch.
+    autocast_dtype = _autocast_dtype(device, precision) if engine == "torch" else None
+    warm_key = (voice, precision, quantize, compile_model)
+    warmed = _warmed.get(pipeline)
+    if warmed is not None and warmed[0] == warm_key:
+        # A pipeline kept from the previous call already has its transforms
+        # applied and was warmed up with these settings; reuse the outcome.
+        logger.info("Reusing warmed-up model")
+        autocast_dtype = warmed[1]
+    else:
+        if quantize:
+            _quantize_model(pipeline)
+        eager_decoder = _compile_model(pipeline) if compile_model else None
+        _preload_voice(pipeline, voice)
+
+        # With compile_model the warm-up also triggers (or loads) compilation.
+        # If it fails, back off one optimization at a time: compile first, then
+        # mixed precision.
+        logger.info("Warming up model...")
+        while True:
+            try:
+                with _inference_context(device, autocast_dtype):
+                    _ = _synthesize_chunk(pipeline, "Warm up.", voice, speed)
+                break
+            except Exception as exc:  # noqa: BLE001 — retry with fewer optimizations
+                if eager_decoder is not None:
+                    logger.warning("Compiled warm-up failed (%s); using eager decoder", exc)
+                    pipeline.model.decoder = eager_decoder
+                    eager_decoder = None
+                elif autocast_dtype is not None:
+                    logger.warning("Mixed-precision warm-up failed (%s); using FP32", exc)
+                    autocast_dtype = None
+                else:
+                    raise
+        # Only needed to fall back from a failed warm-up; holding on to it
+        # would keep the decoder alive past `del pipeline` below.
+        del eager_decoder
+        _warmed[pipeline] = (warm_key, autocast_dtype)
+
+    # Batches never span two blocks, so each block's audio length is exact.
+    batches: List[List[str]] = []
+    batch_block: List[int] = []
+    for index, per_block in enumerate(block_chunks):
+        for batch in _batch_chunks(per_block, budget=chunk_size):
+            batches.append(batch)
+            batch_block.append(index)
+    block_samples = [0] * len(blocks)
     logger.info(
-        "Synthesizing %d chunks on %s (CPU synthesis can take a while)...",
+        "Synthesizing %d chunks in %d batches on %s (CPU synthesis can take a while)...",
         len(chunks),
+        len(batches),
         device,
     )
     start = time.time()
-    audio_chunks: List[np.ndarray] = []
+    total_samples = 0
     failed = 0
-    # Wrap the synthesis loop in torch.no_grad() to prevent gradient accumulation
-    with torch.no_grad():
-        for chunk in tqdm(chunks, desc="TTS", unit="chunk"):
-            try:
-                audio_chunks.append(_synthesize_chunk(pipeline, chunk, voice, speed))
-            except Exception as exc:  # noqa: BLE001 — keep going on bad chunks
-                logger.error("Chunk failed (%s): %.80s", exc, chunk)
-                audio_chunks.append(np.zeros(int(SAMPLE_RATE * 0.5), dtype=np.float32))
-                failed += 1
+    # The WAV copy is written as it is synthesized too, so the full PCM is
+    # never held in memory.
+    wav_path = output_mp3_path.with_suffix(".wav")
+    wav_file = (
+        sf.SoundFile(
+            str(wav_path), "w", samplerate=SAMPLE_RATE, channels=1, subtype="PCM_16"
+        )
+        if keep_wav
+        else contextlib.nullcontext()
+    )
+    encoder = _open_mp3_encoder(output_mp3_path, bitrate, trim_silence=trim_silence)
+    try:
+        # inference_mode skips autograd bookkeeping entirely; the loop also
+        # runs under autocast unless the warm-up showed it is unsupported.
+        with wav_file, _inference_context(device, autocast_dtype):
+            # No torch.cuda.empty_cache() in here: the caching allocator
+            # reuses the previous batch's activation blocks, and flushing
+            # them would force fresh cudaMallocs on every batch. The cache is
+            # released once, after synthesis (_free_device_memory).
+            for batch, index in tqdm(
+                zip(batches, batch_block), total=len(batches), desc="TTS", unit="batch"
+            ):
+                audio, batch_failed = _synthesize_batch(pipeline, batch, voice, speed)
+                encoder.stdin.write(_to_pcm_f32(audio))
+                total_samples += len(audio)
+                block_samples[index] += len(audio)
+                if keep_wav:
+                    wav_file.write(audio)
+                failed += batch_failed
+    except BaseException:
+        encoder.kill()
+        encoder.wait()
+        raise
     synth_seconds = time.time() - start
     logger.info(
         "Synthesis complete in %.1fs (%d chunks, %d failed)",
@@ -185,30 +795,32 @@ def generate_audio_from_text(
         failed,
     )
 
-    full_audio = np.concatenate(audio_chunks)
-
-    wav_path = output_mp3_path.with_suffix(".wav")
-    sf.write(str(wav_path), full_audio, SAMPLE_RATE)
+    if keep_pipeline:
+        _keep_pipeline(pipeline, device, engine)
+        del pipeline
+    else:
+        # Upload doesn't need the model; drop it now so its weights (and any
+        # cached CUDA blocks) are released before the slow tail of the run.
+        del pipeline
+        _free_device_memory(device)
 
-    audio_segment = AudioSegment.from_wav(str(wav_path))
-    if audio_segment.sample_width > 2:
-        audio_segment = audio_segment.set_sample_width(2)
-    audio_segment.export(str(output_mp3_path), format="mp3", bitrate=bitrate)
+    _close_mp3_encoder(encoder)
 
-    duration_min = len(audio_segment) / 1000.0 / 60.0
+    # Duration of the synthesized audio, before any silence trimming.
+    duration_min = total_samples / SAMPLE_RATE / 60.0
     mp3_size_mb = output_mp3_path.stat().st_size / (1024 * 1024)
     logger.info(
-        "Wrote MP3: %s (%.1f min, %.2f MB, bitrate=%s)",
+        "Wrote MP3: %s (%.1f min synthesized, %.2f MB, bitrate=%s)",
         output_mp3_path,
         duration_min,
         mp3_size_mb,
         bitrate,
     )
 
-    if not keep_wav:
-        wav_path.unlink(missing_ok=True)
+    if keep_wav:
+        logger.info("Wrote WAV: %s", wav_path)
 
-    return output_mp3_path
+    return output_mp3_path, [n / SAMPLE_RATE for n in block_samples]
 
 
 def generate_audio_from_file(
@@ -228,7 +840,8 @@ def generate_audio_from_file(
     text = text_path.read_text(encoding="utf-8")
     output_filename = f"{text_path.stem}_generated_audio.mp3"
     output_path = Path(output_dir).resolve() / output_filename
-    return generate_audio_from_text(text, output_path, **kwargs)
+    mp3_path, _ = generate_audio_from_text(text, output_path, **kwargs)
+    return mp3_path
 
 
 def main() -> int:
@@ -249,7 +862,40 @@ def main() -> int:
     parser.add_argument(
         "--keep-wav",
         action="store_true",
-        help="Keep the intermediate WAV alongside the MP3.",
+        help="Also write a WAV copy alongside the MP3 (for debugging).",
+    )
+    parser.add_argument(
+        "--engine",
+        default="torch",
+        choices=ENGINES,
+        help="Inference backend; onnx exports the model once and runs it in onnxruntime.",
+    )
+    parser.add_argument(
+        "--precision",
+        default="auto",
+        choices=PRECISIONS,
+        help="Autocast dtype; auto uses BF16/FP16 on CUDA and FP32 on CPU.",
+    )
+    parser.add_argument(
+        "--quantize",
+        action="store_true",
+        help="Dynamic int8 quantization of the text/prosody layers (CPU only).",
+    )
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="torch.compile the vocoder (slow first run, cached for later runs).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=BATCH_CHAR_BUDGET,
+        help="Max characters of text per synthesis call (sentences are packed up to this).",
+    )
+    parser.add_argument(
+        "--trim-silence",
+        action="store_true",
+        help="Collapse silences longer than 0.6s (also shortens Q&A pauses).",
     )
     parser.add_argument("--verbose", "-v", action="store_true")
     args = parser.parse_args()
@@ -267,6 +913,12 @@ def main() -> int:
         device=args.device,
         bitrate=args.bitrate,
         keep_wav=args.keep_wav,
+        engine=args.engine,
+        precision=args.precision,
+        quantize=args.quantize,
+        compile_model=args.compile,
+        trim_silence=args.trim_silence,
+        chunk_size=args.chunk_size,
     )
     print(str(output_path))
     return 0
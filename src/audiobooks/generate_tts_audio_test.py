@@ -0,0 +1,671 @@
+"""
+Test suite for generate_tts_audio.py
+
+Run with:
+    python -m pytest generate_tts_audio_test.py -v
+"""
+import os
+import sys
+import threading
+import weakref
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+import torch
+
+# Ensure the module under test is importable
+sys.path.insert(0, os.path.dirname(__file__))
+
+import generate_tts_audio
+from generate_tts_audio import PAUSE_MARKER, SAMPLE_RATE
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def pipeline():
+    """A stand-in KPipeline on the CPU with no voices loaded yet."""
+    pipeline = MagicMock()
+    pipeline.voices = {}
+    pipeline.model.device = torch.device("cpu")
+    pipeline.load_voice.return_value = torch.zeros(1)
+    return pipeline
+
+
+@pytest.fixture
+def float32_matmul_precision():
+    """Restore the process-wide float32 matmul precision after the test."""
+    precision = torch.get_float32_matmul_precision()
+    yield precision
+    torch.set_float32_matmul_precision(precision)
+
+
+@pytest.fixture
+def tts_pipeline(mocker, monkeypatch, pipeline):
+    """`pipeline`, returned by _load_pipeline, with the MP3 encoder mocked out.
+    Tests patch anything they want to check on top of this."""
+    monkeypatch.setattr(generate_tts_audio, "_preloaded", {})
+    mocker.patch.object(generate_tts_audio, "_load_pipeline", return_value=pipeline)
+    mocker.patch.object(generate_tts_audio, "_open_mp3_encoder")
+    mocker.patch.object(generate_tts_audio, "_close_mp3_encoder")
+    return pipeline
+
+
+# ---------------------------------------------------------------------------
+# _process_blocks
+# ---------------------------------------------------------------------------
+
+
+class TestProcessBlocks:
+    def test_blocks_are_split_separately(self):
+        # Joined, these would read "...first source.Second..." and stay one chunk.
+        blocks = ["End of the first source.", "Second source here."]
+        assert generate_tts_audio._process_blocks(blocks) == [[blocks[0]], [blocks[1]]]
+
+    def test_long_chunks_split_at_word_boundaries(self):
+        split = generate_tts_audio._validate_and_split_chunk
+        assert split("aaa bbb  ccc https://x.io/y", max_len=7) == ["aaa bbb", "ccc"]
+        assert split("abcdefghij kl", max_len=4) == ["abcd", "efgh", "ij", "kl"]
+        assert split("aa\nbb cc", max_len=6) == ["aa\nbb", "cc"]
+        # Compiled once per max_len, not per call.
+        assert generate_tts_audio._split_re(7) is generate_tts_audio._split_re(7)
+
+    def test_blank_blocks_raise(self, tmp_path):
+        with pytest.raises(ValueError, match="empty"):
+            generate_tts_audio.generate_audio_from_text(["  ", ""], tmp_path / "x.mp3")
+
+
+# ---------------------------------------------------------------------------
+# _batch_chunks
+# ---------------------------------------------------------------------------
+
+
+class TestBatchChunks:
+    def test_packs_chunks_up_to_budget(self):
+        chunks = ["a" * 40, "b" * 40, "c" * 40]
+        batches = generate_tts_audio._batch_chunks(chunks, budget=90)
+        assert batches == [["a" * 40, "b" * 40], ["c" * 40]]
+
+    def test_pause_marker_is_its_own_batch(self):
+        chunks = ["Q1: Why?", PAUSE_MARKER, "Because."]
+        batches = generate_tts_audio._batch_chunks(chunks)
+        assert batches == [["Q1: Why?"], [PAUSE_MARKER], ["Because."]]
+
+    def test_oversized_chunk_is_not_dropped(self):
+        chunks = ["x" * 600]
+        assert generate_tts_audio._batch_chunks(chunks, budget=100) == [chunks]
+
+
+# ---------------------------------------------------------------------------
+# _synthesize_batch
+# ---------------------------------------------------------------------------
+
+
+class TestSynthesizeBatch:
+    def test_single_pipeline_call_for_batch(self):
+        pipeline = MagicMock(return_value=[(None, None, np.ones(10))])
+        audio, failed = generate_tts_audio._synthesize_batch(
+            pipeline, ["One.", "Two."], "af_heart", 1.0
+        )
+        pipeline.assert_called_once()
+        assert pipeline.call_args[0][0] == "One. Two."
+        assert len(audio) == 10
+        assert failed == 0
+
+    def test_falls_back_to_per_chunk_on_failure(self):
+        def fake_pipeline(text, voice, speed):
+            if text == "Bad.":
+                raise RuntimeError("boom")
+            if " " in text:
+                raise RuntimeError("batch boom")
+            return [(None, None, np.ones(10))]
+
+        audio, failed = generate_tts_audio._synthesize_batch(
+            fake_pipeline, ["Good.", "Bad."], "af_heart", 1.0
+        )
+        assert failed == 1
+        # 10 samples for the good chunk + 0.5s of silence for the bad one
+        assert len(audio) == 10 + int(SAMPLE_RATE * 0.5)
+
+
+# ---------------------------------------------------------------------------
+# MP3 encoder
+# ---------------------------------------------------------------------------
+
+
+class TestMp3Encoder:
+    def test_pcm_f32_is_little_endian_float(self):
+        pcm = generate_tts_audio._to_pcm_f32(np.array([0.0, 0.5, -1.0], dtype=np.float64))
+        assert np.frombuffer(pcm, dtype="<f4").tolist() == [0.0, 0.5, -1.0]
+
+    def test_reads_pcm_from_stdin(self, mocker, tmp_path):
+        mocker.patch.object(generate_tts_audio, "_ffmpeg_exe", return_value="ffmpeg")
+        mock_popen = mocker.patch.object(generate_tts_audio.subprocess, "Popen")
+
+        generate_tts_audio._open_mp3_encoder(tmp_path / "out.mp3", "64k")
+
+        cmd = mock_popen.call_args[0][0]
+        assert cmd[0] == "ffmpeg"
+        assert cmd[cmd.index("-i") + 1] == "-"
+        assert cmd[cmd.index("-b:a") + 1] == "64k"
+        assert cmd[-1] == str(tmp_path / "out.mp3")
+        assert "-af" not in cmd
+        assert mock_popen.call_args[1]["stdin"] is generate_tts_audio.subprocess.PIPE
+
+    def test_trim_silence_adds_filter(self, mocker, tmp_path):
+        mocker.patch.object(generate_tts_audio, "_ffmpeg_exe", return_value="ffmpeg")
+        mock_popen = mocker.patch.object(generate_tts_audio.subprocess, "Popen")
+
+        generate_tts_audio._open_mp3_encoder(tmp_path / "out.mp3", "64k", trim_silence=True)
+
+        cmd = mock_popen.call_args[0][0]
+        assert cmd[cmd.index("-af") + 1] == generate_tts_audio.TRIM_SILENCE_FILTER
+
+    def test_close_raises_on_ffmpeg_failure(self):
+        encoder = MagicMock()
+        encoder.communicate.return_value = (None, b"boom")
+        encoder.returncode = 1
+        with pytest.raises(generate_tts_audio.subprocess.CalledProcessError):
+            generate_tts_audio._close_mp3_encoder(encoder)
+
+
+# ---------------------------------------------------------------------------
+# generate_audio_from_text
+# ---------------------------------------------------------------------------
+
+
+class TestGenerateAudioFromText:
+    def test_streams_each_batch_to_encoder(self, mocker, tts_pipeline, tmp_path):
+        tts_pipeline.return_value = [(None, None, np.ones(10))]
+        encoder = MagicMock()
+        mocker.patch.object(generate_tts_audio, "_open_mp3_encoder", return_value=encoder)
+        mock_close = mocker.patch.object(generate_tts_audio, "_close_mp3_encoder")
+        out = tmp_path / "out.mp3"
+        out.write_bytes(b"")
+
+        text = "First sentence here. Q1: A question?\nSecond answer here."
+        result, _ = generate_tts_audio.generate_audio_from_text(text, out)
+
+        assert result == out.resolve()
+        # speech, pause, speech -> three separate writes
+        assert encoder.stdin.write.call_count == 3
+        mock_close.assert_called_once_with(encoder)
+
+    def test_reports_duration_per_block(self, mocker, tts_pipeline, tmp_path):
+        mocker.patch.object(generate_tts_audio, "_synthesize_chunk")
+        mocker.patch.object(
+            generate_tts_audio,
+            "_synthesize_batch",
+            side_effect=lambda p, batch, v, s: (np.zeros(SAMPLE_RATE * len(batch)), 0),
+        )
+        out = tmp_path / "out.mp3"
+        out.write_bytes(b"")
+
+        _, durations = generate_tts_audio.generate_audio_from_text(
+            ["One. Two.", "Three."], out, chunk_size=4
+        )
+
+        # Batches never mix blocks: two one-second chunks, then one.
+        assert durations == [2.0, 1.0]
+
+    def test_keep_wav_streams_pcm_to_disk(self, mocker, tts_pipeline, tmp_path):
+        mocker.patch.object(generate_tts_audio, "_synthesize_chunk")
+        mocker.patch.object(
+            generate_tts_audio, "_synthesize_batch", return_value=(np.full(100, 0.5), 0)
+        )
+        out = tmp_path / "out.mp3"
+        out.write_bytes(b"")
+
+        generate_tts_audio.generate_audio_from_text(
+            ["One.", "Two."], out, keep_wav=True
+        )
+
+        data, sr = generate_tts_audio.sf.read(str(tmp_path / "out.wav"))
+        assert sr == SAMPLE_RATE
+        assert len(data) == 200
+        assert np.allclose(data, 0.5, atol=1e-4)
+
+    def test_keep_pipeline_hands_model_to_next_call(self, tts_pipeline, tmp_path):
+        tts_pipeline.return_value = [(None, None, np.ones(10))]
+        out = tmp_path / "out.mp3"
+        out.write_bytes(b"")
+
+        generate_tts_audio.generate_audio_from_text("One.", out, keep_pipeline=True)
+        generate_tts_audio.generate_audio_from_text("Two.", out)
+
+        generate_tts_audio._load_pipeline.assert_called_once()
+        assert generate_tts_audio._preloaded == {}
+
+    def test_kept_pipeline_is_warmed_up_once(self, mocker, tts_pipeline, tmp_path):
+        warm_up = mocker.patch.object(generate_tts_audio, "_synthesize_chunk")
+        mocker.patch.object(
+            generate_tts_audio, "_synthesize_batch", return_value=(np.zeros(1), 0)
+        )
+        out = tmp_path / "out.mp3"
+        out.write_bytes(b"")
+
+        generate_tts_audio.generate_audio_from_text("One.", out, keep_pipeline=True)
+        generate_tts_audio.generate_audio_from_text("Two.", out, keep_pipeline=True)
+        assert warm_up.call_count == 1
+
+        # Different settings need their own warm-up.
+        generate_tts_audio.generate_audio_from_text("Three.", out, precision="fp32")
+        assert warm_up.call_count == 2
+
+    def test_eager_decoder_is_released_before_freeing_memory(
+        self, mocker, tts_pipeline, tmp_path
+    ):
+        decoders = []
+
+        def compile_model(p):
+            decoder = torch.nn.Linear(1, 1)
+            decoders.append(weakref.ref(decoder))
+            return decoder
+
+        mocker.patch.object(generate_tts_audio, "_compile_model", side_effect=compile_model)
+        mocker.patch.object(generate_tts_audio, "_synthesize_chunk")
+        mocker.patch.object(
+            generate_tts_audio, "_synthesize_batch", return_value=(np.zeros(1), 0)
+        )
+        released = []
+        mocker.patch.object(
+            generate_tts_audio,
+            "_free_device_memory",
+            side_effect=lambda device: released.append(decoders[0]() is None),
+        )
+        out = tmp_path / "out.mp3"
+        out.write_bytes(b"")
+
+        generate_tts_audio.generate_audio_from_text("Hello.", out, compile_model=True)
+
+        assert released == [True]
+
+    def test_warm_up_failure_restores_eager_decoder(
+        self, mocker, monkeypatch, tts_pipeline, tmp_path
+    ):
+        monkeypatch.setattr(torch._dynamo.config, "suppress_errors", False)
+        eager = tts_pipeline.model.decoder
+        mocker.patch.object(generate_tts_audio, "_local_voice_file", return_value=None)
+        mocker.patch.object(generate_tts_audio.torch, "compile")
+        mocker.patch.object(
+            generate_tts_audio,
+            "_synthesize_chunk",
+            side_effect=[RuntimeError("inductor"), np.zeros(1)],
+        )
+        mocker.patch.object(
+            generate_tts_audio, "_synthesize_batch", return_value=(np.zeros(1), 0)
+        )
+        out = tmp_path / "out.mp3"
+        out.write_bytes(b"")
+
+        generate_tts_audio.generate_audio_from_text("Hello.", out, compile_model=True)
+
+        assert tts_pipeline.model.decoder is eager
+
+    def test_kills_encoder_when_synthesis_aborts(self, mocker, tts_pipeline, tmp_path):
+        mocker.patch.object(generate_tts_audio, "_synthesize_chunk")
+        mocker.patch.object(
+            generate_tts_audio, "_synthesize_batch", side_effect=KeyboardInterrupt
+        )
+        encoder = MagicMock()
+        mocker.patch.object(generate_tts_audio, "_open_mp3_encoder", return_value=encoder)
+
+        with pytest.raises(KeyboardInterrupt):
+            generate_tts_audio.generate_audio_from_text("Hello there.", tmp_path / "o.mp3")
+        encoder.kill.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# _inference_context
+# ---------------------------------------------------------------------------
+
+
+class TestInferenceContext:
+    def test_cpu_disables_autograd_without_autocast(self):
+        dtype = generate_tts_audio._autocast_dtype("cpu", "auto")
+        assert dtype is None
+        with generate_tts_audio._inference_context("cpu", dtype):
+            assert torch.is_inference_mode_enabled()
+            assert not torch.is_autocast_enabled("cpu")
+
+    def test_explicit_precision_enables_autocast(self):
+        dtype = generate_tts_audio._autocast_dtype("cpu", "bf16")
+        assert dtype is torch.bfloat16
+        with generate_tts_audio._inference_context("cpu", dtype):
+            assert torch.is_autocast_enabled("cpu")
+        assert generate_tts_audio._autocast_dtype("cuda", "fp32") is None
+
+    def test_to_numpy_upcasts_half_tensors(self):
+        out = generate_tts_audio._to_numpy(torch.ones(4, dtype=torch.bfloat16))
+        assert out.dtype == np.float32
+        assert out.tolist() == [1.0, 1.0, 1.0, 1.0]
+
+
+# ---------------------------------------------------------------------------
+# _load_pipeline
+# ---------------------------------------------------------------------------
+
+
+class TestLoadPipeline:
+    def test_builds_model_on_device_and_passes_it_to_pipeline(self, mocker):
+        mock_model_cls = mocker.patch("kokoro.KModel")
+        mock_pipeline_cls = mocker.patch("kokoro.KPipeline")
+
+        generate_tts_audio._load_pipeline("cpu")
+
+        model = mock_model_cls.return_value.eval.return_value
+        assert mock_pipeline_cls.call_args[1]["model"] is model
+        assert mock_pipeline_cls.call_args[1]["device"] == "cpu"
+
+    def test_checkpoint_is_memory_mapped(self, mocker):
+        from torch.utils.serialization import config
+
+        mmap_during_load = []
+
+        def build_model(**kwargs):
+            mmap_during_load.append(config.load.mmap)
+            return MagicMock()
+
+        mocker.patch("kokoro.KModel", side_effect=build_model)
+        mocker.patch("kokoro.KPipeline")
+
+        generate_tts_audio._load_pipeline("cpu")
+
+        assert mmap_during_load == [True]
+        assert config.load.mmap is False
+
+
+# ---------------------------------------------------------------------------
+# onnx engine
+# ---------------------------------------------------------------------------
+
+
+class TestOnnxEngine:
+    def test_adapter_maps_phonemes_and_runs_session(self):
+        session = MagicMock()
+        session.run.return_value = [np.ones((1, 480), dtype=np.float32), np.array([2, 3, 2])]
+        model = generate_tts_audio._OnnxKModel(session, {"h": 5, "i": 7}, context_length=512)
+
+        output = model("hi?", torch.zeros(1, 256), 1.2, return_output=True)
+
+        feeds = session.run.call_args[0][1]
+        assert feeds["input_ids"].tolist() == [[0, 5, 7, 0]]  # unknown '?' is dropped
+        assert feeds["speed"].tolist() == pytest.approx([1.2])
+        assert output.audio.shape == (480,)
+        assert output.pred_dur.tolist() == [2, 3, 2]
+
+    def test_export_writes_loadable_model(self, mocker, tmp_path):
+        onnx = pytest.importorskip("onnx")
+        kokoro = pytest.importorskip("kokoro")
+
+        class TinyKModel(torch.nn.Module):
+            """Same forward_with_tokens signature as KModel, a few weights."""
+
+            def __init__(self):
+                super().__init__()
+                self.proj = torch.nn.Linear(256, 4)
+
+            def forward_with_tokens(self, input_ids, ref_s, speed):
+                waveform = (self.proj(ref_s) / speed).repeat(1, input_ids.shape[1])
+                return waveform.flatten(), input_ids[0] * 0 + 2
+
+        mock_kmodel = mocker.patch.object(kokoro, "KModel", return_value=TinyKModel())
+        onnx_path = tmp_path / "kokoro.onnx"
+
+        generate_tts_audio._export_onnx(onnx_path)
+
+        assert mock_kmodel.call_args[1]["disable_complex"] is True
+        assert not onnx_path.with_suffix(".onnx.tmp").exists()
+        graph = onnx.load(str(onnx_path)).graph
+        assert [i.name for i in graph.input] == ["input_ids", "ref_s", "speed"]
+        assert graph.input[0].type.tensor_type.shape.dim[1].dim_param == "tokens"
+
+    def test_export_on_torch_without_dynamo_keyword(self, mocker, monkeypatch, tmp_path):
+        kokoro = pytest.importorskip("kokoro")
+        mocker.patch.object(kokoro, "KModel")
+        calls = []
+
+        def old_export(model, args, f, input_names=None, output_names=None,
+                       dynamic_axes=None, opset_version=None):
+            calls.append(opset_version)
+            Path(f).write_bytes(b"onnx")
+
+        monkeypatch.setattr(generate_tts_audio.torch.onnx, "export", old_export)
+
+        generate_tts_audio._export_onnx(tmp_path / "kokoro.onnx")
+
+        assert calls == [17]
+        assert (tmp_path / "kokoro.onnx").read_bytes() == b"onnx"
+
+    def test_requires_onnxruntime(self, monkeypatch):
+        monkeypatch.setattr(generate_tts_audio, "onnxruntime", None)
+        with pytest.raises(RuntimeError, match="onnxruntime"):
+            generate_tts_audio._load_onnx_pipeline("cpu")
+
+    def test_cuda_provider_used_when_available(self, monkeypatch):
+        ort = MagicMock()
+        ort.get_available_providers.return_value = ["CUDAExecutionProvider", "CPUExecutionProvider"]
+        monkeypatch.setattr(generate_tts_audio, "onnxruntime", ort)
+
+        providers = generate_tts_audio._ort_providers("cuda:1")
+
+        assert providers[0][0] == "CUDAExecutionProvider"
+        assert providers[0][1]["device_id"] == 1
+        assert providers[-1] == "CPUExecutionProvider"
+
+
+# ---------------------------------------------------------------------------
+# preload_pipeline
+# ---------------------------------------------------------------------------
+
+
+class TestPreloadPipeline:
+    def test_preloaded_pipeline_is_taken_once(self, mocker, monkeypatch):
+        monkeypatch.setattr(generate_tts_audio, "_preloaded", {})
+        pipeline = MagicMock()
+        mock_load = mocker.patch.object(generate_tts_audio, "_load_pipeline", return_value=pipeline)
+
+        future = generate_tts_audio.preload_pipeline("cpu")
+        assert generate_tts_audio.preload_pipeline("cpu") is future
+        assert future.result(timeout=5) is pipeline
+
+        assert generate_tts_audio._take_pipeline("cpu", "torch") is pipeline
+        assert mock_load.call_count == 1
+        assert generate_tts_audio._preloaded == {}
+
+    def test_run_in_background_uses_daemon_thread(self):
+        threads = []
+
+        def work(x, y=0):
+            threads.append(threading.current_thread())
+            return x + y
+
+        assert generate_tts_audio.run_in_background("job", work, 1, y=2).result(timeout=5) == 3
+        assert threads[0].daemon and threads[0].name == "job"
+        failed = generate_tts_audio.run_in_background("job", work, None)
+        assert isinstance(failed.exception(timeout=5), TypeError)
+
+    def test_failed_preload_loads_again(self, mocker, monkeypatch):
+        monkeypatch.setattr(generate_tts_audio, "_preloaded", {})
+        pipeline = MagicMock()
+        mocker.patch.object(
+            generate_tts_audio, "_load_pipeline", side_effect=[OSError("disk"), pipeline]
+        )
+
+        generate_tts_audio.preload_pipeline("cpu").exception(timeout=5)
+
+        assert generate_tts_audio._take_pipeline("cpu", "torch") is pipeline
+
+
+# ---------------------------------------------------------------------------
+# _quantize_model
+# ---------------------------------------------------------------------------
+
+
+class TestQuantizeModel:
+    def test_quantizes_front_end_but_not_decoder(self):
+        model = torch.nn.Module()
+        model.bert = torch.nn.Sequential(torch.nn.Linear(4, 4))
+        model.predictor = torch.nn.LSTM(4, 4, batch_first=True)
+        model.decoder = torch.nn.Linear(4, 4)
+        pipeline = MagicMock()
+        pipeline.model = model
+
+        generate_tts_audio._quantize_model(pipeline)
+
+        assert type(model.bert[0]) is not torch.nn.Linear
+        assert type(model.predictor) is not torch.nn.LSTM
+        assert type(model.decoder) is torch.nn.Linear
+
+
+# ---------------------------------------------------------------------------
+# _compile_model
+# ---------------------------------------------------------------------------
+
+
+class TestCompileModel:
+    def test_compiles_decoder_with_persistent_cache(self, mocker, monkeypatch, tmp_path):
+        monkeypatch.setenv("TORCHINDUCTOR_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(torch._dynamo.config, "suppress_errors", False)
+        mock_compile = mocker.patch.object(generate_tts_audio.torch, "compile")
+        pipeline = MagicMock()
+        decoder = pipeline.model.decoder
+
+        eager = generate_tts_audio._compile_model(pipeline)
+
+        mock_compile.assert_called_once_with(decoder, dynamic=True, mode="default")
+        assert pipeline.model.decoder is mock_compile.return_value
+        assert eager is decoder
+        assert os.environ["TORCHINDUCTOR_CACHE_DIR"] == str(tmp_path)
+
+    def test_already_compiled_decoder_is_not_wrapped_again(self, mocker, monkeypatch, tmp_path):
+        monkeypatch.setenv("TORCHINDUCTOR_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(torch._dynamo.config, "suppress_errors", False)
+        eager = torch.nn.Linear(2, 2)
+        pipeline = MagicMock()
+        pipeline.model.decoder = torch.compile(eager)
+        mock_compile = mocker.patch.object(generate_tts_audio.torch, "compile")
+
+        assert generate_tts_audio._compile_model(pipeline) is eager
+        mock_compile.assert_not_called()
+
+    def test_old_torch_runs_eager(self, monkeypatch):
+        monkeypatch.delattr(generate_tts_audio.torch, "compile")
+        pipeline = MagicMock()
+        decoder = pipeline.model.decoder
+
+        assert generate_tts_audio._compile_model(pipeline) is None
+        assert pipeline.model.decoder is decoder
+
+    def test_cuda_decoder_serves_every_length_from_one_graph(self, monkeypatch, tmp_path):
+        from torch._dynamo.utils import counters
+
+        monkeypatch.setenv("TORCHINDUCTOR_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(torch._dynamo.config, "suppress_errors", False)
+        torch._dynamo.reset()
+        counters.clear()
+        eager = torch.nn.Conv1d(2, 2, 3, padding=1).eval()
+        pipeline = MagicMock()
+        pipeline.model.device = torch.device("cuda")
+        pipeline.model.decoder = eager
+
+        generate_tts_audio._compile_model(pipeline)
+        with torch.inference_mode():
+            for length in (40, 57, 91):
+                x = torch.randn(1, 2, length)
+                assert torch.allclose(pipeline.model.decoder(x), eager(x), atol=1e-5)
+
+        # One dynamic-shape graph, and no per-length CUDA graph recordings.
+        assert counters["stats"]["unique_graphs"] == 1
+        assert counters["inductor"]["cudagraph_skips"] == 0
+        torch._dynamo.reset()
+
+
+# ---------------------------------------------------------------------------
+# _preload_voice
+# ---------------------------------------------------------------------------
+
+
+class TestPreloadVoice:
+    def test_caches_device_resident_pack(self, mocker, pipeline):
+        mocker.patch.object(generate_tts_audio, "_local_voice_file", return_value=None)
+        pipeline.load_voice.return_value = torch.zeros(3, 1, 4)
+
+        generate_tts_audio._preload_voice(pipeline, "af_heart")
+
+        pipeline.load_voice.assert_called_once_with("af_heart")
+        assert pipeline.voices["af_heart"].device == torch.device("cpu")
+
+    def test_memory_maps_local_voice_file(self, pipeline, tmp_path):
+        voice_path = tmp_path / "custom_voice.pt"
+        torch.save(torch.ones(3, 1, 4), voice_path)
+        pipeline.load_voice.side_effect = lambda v: pipeline.voices[v]
+
+        generate_tts_audio._preload_voice(pipeline, str(voice_path))
+
+        assert torch.equal(pipeline.voices[str(voice_path)], torch.ones(3, 1, 4))
+
+    def test_named_voice_loaded_from_hub_cache(self, mocker, pipeline, tmp_path):
+        cached = tmp_path / "af_heart.pt"
+        torch.save(torch.full((2, 1, 4), 2.0), cached)
+        mock_download = mocker.patch(
+            "huggingface_hub.hf_hub_download", return_value=str(cached)
+        )
+        pipeline.load_voice.side_effect = lambda v: pipeline.voices[v]
+
+        generate_tts_audio._preload_voice(pipeline, "af_heart")
+
+        assert mock_download.call_args[1]["local_files_only"] is True
+        assert torch.equal(pipeline.voices["af_heart"], torch.full((2, 1, 4), 2.0))
+
+    def test_uncached_voice_is_left_to_pipeline(self, mocker):
+        mocker.patch("huggingface_hub.hf_hub_download", side_effect=OSError("not cached"))
+        assert generate_tts_audio._local_voice_file("af_heart") is None
+        assert generate_tts_audio._local_voice_file("af_heart,af_bella") is None
+
+
+# ---------------------------------------------------------------------------
+# _configure_torch
+# ---------------------------------------------------------------------------
+
+
+class TestConfigureTorch:
+    def test_cuda_enables_tf32(self, monkeypatch, float32_matmul_precision):
+        torch.set_float32_matmul_precision("highest")
+        monkeypatch.setattr(torch.backends.cudnn, "allow_tf32", False)
+        generate_tts_audio._configure_torch("cuda")
+        assert torch.get_float32_matmul_precision() == "high"
+        assert torch.backends.cuda.matmul.allow_tf32 is True
+        assert torch.backends.cudnn.allow_tf32 is True
+
+    def test_cpu_leaves_settings_alone(self, mocker, monkeypatch):
+        mocker.patch.object(generate_tts_audio.torch, "set_num_threads")
+        mocker.patch.object(generate_tts_audio.torch, "set_num_interop_threads")
+        monkeypatch.setattr(torch.backends.cuda.matmul, "allow_tf32", False)
+        generate_tts_audio._configure_torch("cpu")
+        assert torch.backends.cuda.matmul.allow_tf32 is False
+
+    def test_cpu_limits_threads(self, mocker, monkeypatch):
+        monkeypatch.setenv("OMP_NUM_THREADS", "2")
+        set_threads = mocker.patch.object(generate_tts_audio.torch, "set_num_threads")
+        set_interop = mocker.patch.object(
+            generate_tts_audio.torch, "set_num_interop_threads", side_effect=RuntimeError
+        )
+        generate_tts_audio._configure_torch("cpu")
+        set_threads.assert_called_once_with(2)
+        set_interop.assert_called_once_with(1)
+
+    @pytest.mark.parametrize("value, expected", [("4,2", 4), ("", 1), ("abc", 1), ("0", 1)])
+    def test_cpu_tolerates_unusual_omp_values(self, mocker, monkeypatch, value, expected):
+        monkeypatch.setenv("OMP_NUM_THREADS", value)
+        set_threads = mocker.patch.object(generate_tts_audio.torch, "set_num_threads")
+        mocker.patch.object(
+            generate_tts_audio.torch, "set_num_interop_threads", side_effect=RuntimeError
+        )
+        generate_tts_audio._configure_torch("cpu")
+        set_threads.assert_called_once_with(expected)
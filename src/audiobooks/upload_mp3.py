@@ -10,18 +10,46 @@ Usage examples:
   python upload_mp3.py "C:\\path\\to\\my_audio.mp3"
 """
 import argparse
+import bisect
 import configparser
 import gc
 import json
 import logging
 import math
 import os
+import shutil
+import subprocess
 import sys
+import tempfile
 import time
+import types
 from pathlib import Path
 
+import numpy as np
 from pydub import AudioSegment
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from mutagen.mp3 import MP3
+except ImportError:  # pragma: no cover
+    MP3 = None
+
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:  # pragma: no cover
+    MultipartEncoder = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import imageio_ffmpeg
+except ImportError:  # pragma: no cover
+    imageio_ffmpeg = None
 
 # Local defaults (kept small and explicit so this script is lightweight)
 CONFIG_FILE = ".\\src\\audiobooks\\config.ini"
@@ -29,10 +57,27 @@ CONFIG_FILE = ".\\src\\audiobooks\\config.ini"
 ARCHIVE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive_mp3")
 MAX_UPLOAD_SIZE_MB = 35.0
 
+# Reused across retries and split-file parts so each upload skips a fresh
+# TCP/TLS handshake. The adapter only retries failed connects: nothing has
+# been sent yet, so even a POST is safe to repeat. Server errors and
+# mid-upload failures are left to upload_single_file's backoff loop, since a
+# streamed multipart body can't be rewound by urllib3.
+_HTTP_RETRY = Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.5)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=_HTTP_RETRY))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=_HTTP_RETRY))
+
 
 logger = logging.getLogger(__name__)
 
 
+def _json_dumps(obj):
+    """Serialize ``obj`` to UTF-8 JSON bytes, preferring orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
 def load_config(config_path=CONFIG_FILE):
     if not os.path.exists(config_path):
         logger.error("Configuration file '%s' not found.", config_path)
@@ -40,10 +85,10 @@ def load_config(config_path=CONFIG_FILE):
     config = configparser.ConfigParser()
     config.read(config_path)
     try:
-        return {
+        return types.MappingProxyType({
             "api_url": config["WebApp"]["API_URL"],
             "api_key": config["WebApp"]["API_KEY"],
-        }
+        })
     except KeyError as e:
         logger.error("Missing key in %s: %s", config_path, e)
         sys.exit(1)
@@ -69,11 +114,22 @@ def upload_single_file(api_url, api_key, filepath, metadata):
                         audio_file,
                         "audio/mpeg",
                     ),
-                    "metadata": (None, json.dumps(metadata), "application/json"),
+                    "metadata": (None, _json_dumps(metadata), "application/json"),
                 }
 
                 logger.info("Attempt %s of %s: Uploading...", attempt + 1, max_retries)
-                response = requests.post(url, headers=headers, files=files, timeout=300)
+                if MultipartEncoder is not None:
+                    # Stream the multipart body from disk instead of letting
+                    # requests read the whole MP3 into memory first.
+                    encoder = MultipartEncoder(fields=files)
+                    response = _SESSION.post(
+                        url,
+                        headers={**headers, "Content-Type": encoder.content_type},
+                        data=encoder,
+                        timeout=300,
+                    )
+                else:
+                    response = _SESSION.post(url, headers=headers, files=files, timeout=300)
                 response.raise_for_status()
 
                 logger.info("Upload successful. Server response: %s", response.json())
@@ -143,19 +199,14 @@ def upload_audiobook(api_url, api_key, mp3_path, base_title=None, text_blocks=No
         file_size_mb = mp3_path.stat().st_size / (1024 * 1024)
         logger.info("Detected MP3 size: %.2f MB", file_size_mb)
 
-        audio = AudioSegment.from_mp3(mp3_path)
-
         if base_title is None:
             base_title = f"Manual Upload: {mp3_path.name}"
 
         if file_size_mb <= MAX_UPLOAD_SIZE_MB:
             # Upload single file
             logger.info("File size is within the upload limit; uploading directly.")
-            metadata = (
-                _create_metadata(base_title, audio, text_blocks)
-                if text_blocks
-                else create_metadata(base_title, audio)
-            )
+            duration_ms = _mp3_duration_ms(mp3_path)
+            metadata = _metadata_for_duration(base_title, duration_ms, text_blocks)
             success = upload_single_file(api_url, api_key, str(mp3_path), metadata)
             if not success:
                 logger.error("Upload failed.")
@@ -163,7 +214,17 @@ def upload_audiobook(api_url, api_key, mp3_path, base_title=None, text_blocks=No
             logger.info("Done.")
             return True
         else:
-            # Split and upload chunks
+            num_chunks = math.ceil(file_size_mb / MAX_UPLOAD_SIZE_MB)
+            # A fresh directory per run, so parts left by an earlier run can't
+            # be picked up, and the parts are deleted once they're uploaded.
+            with tempfile.TemporaryDirectory(dir=ARCHIVE_FOLDER) as part_dir:
+                parts = _segment_mp3(mp3_path, num_chunks, part_dir)
+                if parts is not None:
+                    return _upload_parts(
+                        api_url, api_key, parts, base_title, text_blocks
+                    )
+            # No usable ffmpeg: decode and re-export the parts with pydub.
+            audio = AudioSegment.from_mp3(mp3_path)
             return split_and_upload_chunks(
                 api_url,
                 api_key,
@@ -179,6 +240,135 @@ def upload_audiobook(api_url, api_key, mp3_path, base_title=None, text_blocks=No
         return False
 
 
+def _mp3_duration_ms(mp3_path):
+    """Return the MP3 duration in milliseconds without decoding the audio.
+
+    Tries mutagen's frame-header parse, then ffprobe's container read, and
+    only falls back to a full pydub decode when neither is available.
+    """
+    if MP3 is not None:
+        try:
+            return MP3(str(mp3_path)).info.length * 1000.0
+        except Exception as e:
+            logger.debug("mutagen could not read %s (%s).", mp3_path, e)
+
+    duration_ms = _ffprobe_duration_ms(mp3_path)
+    if duration_ms is not None:
+        return duration_ms
+
+    logger.debug("Decoding %s to measure its duration.", mp3_path)
+    return len(AudioSegment.from_mp3(mp3_path))
+
+
+def _ffprobe_duration_ms(mp3_path):
+    """Read the duration with ffprobe; None if ffprobe is missing or fails."""
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe is None:
+        return None
+    try:
+        out = subprocess.check_output(
+            [
+                ffprobe,
+                "-v", "error",
+                "-show_entries", "format=duration",
+                "-of", "default=nw=1:nk=1",
+                str(mp3_path),
+            ],
+            stderr=subprocess.DEVNULL,
+            timeout=30,
+        )
+        return float(out.strip()) * 1000.0
+    except (subprocess.SubprocessError, OSError, ValueError) as e:
+        logger.debug("ffprobe could not read %s (%s).", mp3_path, e)
+        return None
+
+
+def _ffmpeg_exe():
+    """Prefer the ffmpeg binary bundled with imageio-ffmpeg, else the one on PATH."""
+    if imageio_ffmpeg is not None:
+        try:
+            return imageio_ffmpeg.get_ffmpeg_exe()
+        except RuntimeError:
+            pass
+    return "ffmpeg"
+
+
+def _segment_mp3(mp3_path, num_chunks, out_dir):
+    """Cut the MP3 into about `num_chunks` equal parts in `out_dir` with
+    ffmpeg's segment muxer. The MP3 frames are copied as-is, so nothing is
+    decoded or re-encoded. `out_dir` should be empty. Returns the part paths
+    in order, or None if ffmpeg is missing or fails."""
+    mp3_path = Path(mp3_path)
+    # Round up so frame-boundary jitter can't leave a sliver of a last part.
+    segment_s = math.ceil(_mp3_duration_ms(mp3_path) / num_chunks) / 1000.0
+    # The segment muxer expands %-sequences in the whole output path.
+    prefix = os.path.join(out_dir, mp3_path.stem).replace("%", "%%")
+    pattern = f"{prefix}_part_%d.mp3"
+    try:
+        subprocess.run(
+            [
+                _ffmpeg_exe(),
+                "-v", "error",
+                "-y",
+                "-i", str(mp3_path),
+                "-map", "0:a",
+                "-c", "copy",
+                "-f", "segment",
+                "-segment_time", f"{segment_s:.3f}",
+                "-segment_start_number", "1",
+                pattern,
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=300,
+        )
+    except (subprocess.SubprocessError, OSError) as e:
+        logger.warning("ffmpeg could not split %s (%s).", mp3_path, e)
+        return None
+
+    parts = []
+    while os.path.exists(pattern % (len(parts) + 1)):
+        parts.append(pattern % (len(parts) + 1))
+    if not parts:
+        return None
+    named = []
+    for i, part in enumerate(parts):
+        target = os.path.join(
+            out_dir, f"{mp3_path.stem}_part_{i+1}_of_{len(parts)}.mp3"
+        )
+        os.replace(part, target)
+        named.append(target)
+    return named
+
+
+def _upload_parts(api_url, api_key, parts, base_title, text_blocks=None):
+    """Upload already-split MP3 parts in order, stopping at the first failure."""
+    logger.info(
+        "File exceeds %.1f MB. Split into %s parts.", MAX_UPLOAD_SIZE_MB, len(parts)
+    )
+    durations_ms = [_mp3_duration_ms(part) for part in parts]
+    chapters = (
+        _create_chapter_list(sum(durations_ms), text_blocks) if text_blocks else None
+    )
+    start_ms = 0.0
+    for i, (part, duration_ms) in enumerate(zip(parts, durations_ms)):
+        chunk_title = f"{base_title} (Part {i+1} of {len(parts)})"
+        part_chapters = (
+            _chapters_in_range(chapters, start_ms, start_ms + duration_ms)
+            if chapters
+            else None
+        )
+        metadata = _metadata_for_chapters(chunk_title, duration_ms, part_chapters)
+        start_ms += duration_ms
+        if not upload_single_file(api_url, api_key, part, metadata):
+            logger.error("Upload failed for chunk %s. Stopping further uploads.", i + 1)
+            return False
+
+    logger.info("All parts uploaded successfully.")
+    return True
+
+
 def split_and_upload_chunks(
     api_url, api_key, mp3_path, audio, base_title, file_size_mb, text_blocks=None
 ):
@@ -190,6 +380,7 @@ def split_and_upload_chunks(
         "File exceeds %.1f MB. Splitting into %s parts.", MAX_UPLOAD_SIZE_MB, num_chunks
     )
     chunk_duration_ms = math.ceil(len(audio) / num_chunks)
+    chapters = _create_chapter_list(len(audio), text_blocks) if text_blocks else None
 
     for i in range(num_chunks):
         start_ms = i * chunk_duration_ms
@@ -209,8 +400,10 @@ def split_and_upload_chunks(
 
         chunk_title = f"{base_title} (Part {i+1} of {num_chunks})"
         metadata = (
-            _create_metadata(chunk_title, chunk, text_blocks)
-            if text_blocks
+            _metadata_for_chapters(
+                chunk_title, len(chunk), _chapters_in_range(chapters, start_ms, end_ms)
+            )
+            if chapters
             else create_metadata(chunk_title, chunk)
         )
 
@@ -226,43 +419,68 @@ def split_and_upload_chunks(
 
 
 def create_metadata(title, audio_segment):
-    duration_s = len(audio_segment) / 1000.0
-    # Simple single-chapter metadata to make it playable in the web UI
-    chapters_dict = {"Part Start": 0}
-    return {
-        "title": title,
-        "duration_seconds": int(duration_s),
-        "chapters_json": json.dumps(chapters_dict),
-    }
+    return _metadata_for_duration(title, len(audio_segment))
 
 
 def _create_chapter_list(total_duration_ms, text_blocks):
-    """Create chapters with proportional start times based on text lengths."""
-    total_chars = sum(len(block["text"]) for block in text_blocks)
-    chapters = []
-    cumulative_chars = 0
-    for block in text_blocks:
-        start_time_ms = (
-            (cumulative_chars / total_chars) * total_duration_ms
-            if total_chars > 0
-            else 0
-        )
-        chapters.append({"title": block["title"], "start_time_ms": start_time_ms})
-        cumulative_chars += len(block["text"])
-    return chapters
+    """Create chapters with proportional start times. Blocks carrying a
+    measured "duration_s" (from TTS) are placed by audio length; otherwise
+    text length is used as an estimate."""
+    if all("duration_s" in block for block in text_blocks):
+        weights = (block["duration_s"] for block in text_blocks)
+    else:
+        weights = (len(block["text"]) for block in text_blocks)
+    lengths = np.fromiter(weights, dtype=np.float64, count=len(text_blocks))
+    total_length = float(lengths.sum())
+    if total_length > 0:
+        # Offset of each block = prefix sum of the preceding lengths.
+        offsets = np.concatenate(([0], np.cumsum(lengths[:-1])))
+        start_times_ms = offsets / total_length * total_duration_ms
+    else:
+        start_times_ms = np.zeros(len(text_blocks))
+    return [
+        {"title": block["title"], "start_time_ms": float(start_time_ms)}
+        for block, start_time_ms in zip(text_blocks, start_times_ms)
+    ]
+
+
+def _chapters_in_range(chapters, start_ms, end_ms):
+    """The chapters of a part covering [start_ms, end_ms) of the full audio,
+    with start times relative to the part. The chapter still playing at
+    start_ms opens the part at 0. `chapters` must be sorted by start time,
+    as _create_chapter_list returns them."""
+    starts = [c["start_time_ms"] for c in chapters]
+    first = max(bisect.bisect_right(starts, start_ms) - 1, 0)
+    last = max(bisect.bisect_left(starts, end_ms), first + 1)
+    return [
+        {"title": c["title"], "start_time_ms": max(c["start_time_ms"] - start_ms, 0.0)}
+        for c in chapters[first:last]
+    ]
 
 
 def _create_metadata(title, audio_segment, text_blocks):
     """Create chapter-aware metadata for an audiobook."""
-    duration_s = len(audio_segment) / 1000.0
-    chapters = _create_chapter_list(len(audio_segment), text_blocks)
+    return _metadata_for_duration(title, len(audio_segment), text_blocks)
+
+
+def _metadata_for_duration(title, duration_ms, text_blocks=None):
+    """Build upload metadata from a duration, with chapters when text blocks are given."""
+    chapters = _create_chapter_list(duration_ms, text_blocks) if text_blocks else None
+    return _metadata_for_chapters(title, duration_ms, chapters)
+
 
-    chapters_dict = {c["title"]: int(c["start_time_ms"] / 1000) for c in chapters}
+def _metadata_for_chapters(title, duration_ms, chapters=None):
+    """Build upload metadata from a duration and an optional chapter list."""
+    if chapters:
+        chapters_dict = {c["title"]: int(c["start_time_ms"] / 1000) for c in chapters}
+    else:
+        # Simple single-chapter metadata to make it playable in the web UI
+        chapters_dict = {"Part Start": 0}
 
     return {
         "title": title,
-        "duration_seconds": int(duration_s),
-        "chapters_json": json.dumps(chapters_dict),
+        "duration_seconds": int(duration_ms / 1000.0),
+        "chapters_json": _json_dumps(chapters_dict).decode("utf-8"),
     }
 
 
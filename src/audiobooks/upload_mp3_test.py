@@ -7,9 +7,10 @@ Run with:
 import json
 import math
 import os
+import subprocess
 import sys
 from pathlib import Path
-from unittest.mock import MagicMock, mock_open, patch, call
+from unittest.mock import ANY, MagicMock, mock_open, patch, call
 
 import pytest
 import requests
@@ -112,6 +113,13 @@ class TestCreateMetadata:
         md = upload_mp3.create_metadata("Title", seg)
         assert md["duration_seconds"] == 90
 
+    def test_json_dumps_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(upload_mp3, "orjson", None)
+        payload = {"title": "Café", "chapters_json": "{}"}
+        encoded = upload_mp3._json_dumps(payload)
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == payload
+
 
 # ---------------------------------------------------------------------------
 # _create_chapter_list
@@ -136,6 +144,14 @@ class TestCreateChapterList:
         assert len(chapters) == 1
         assert chapters[0]["start_time_ms"] == 0
 
+    def test_measured_durations_override_text_length(self):
+        blocks = [
+            {"title": "A", "text": "x" * 100, "duration_s": 10.0},
+            {"title": "B", "text": "x", "duration_s": 30.0},
+        ]
+        chapters = upload_mp3._create_chapter_list(40_000, blocks)
+        assert [c["start_time_ms"] for c in chapters] == [0.0, 10_000.0]
+
     def test_empty_text_blocks(self):
         blocks = [
             {"title": "A", "text": ""},
@@ -148,6 +164,25 @@ class TestCreateChapterList:
         assert chapters[1]["start_time_ms"] == 0
 
 
+class TestChaptersInRange:
+    CHAPTERS = [
+        {"title": "A", "start_time_ms": 0.0},
+        {"title": "B", "start_time_ms": 40_000.0},
+        {"title": "C", "start_time_ms": 70_000.0},
+    ]
+
+    def test_part_keeps_only_its_chapters_relative_to_part_start(self):
+        chapters = upload_mp3._chapters_in_range(self.CHAPTERS, 50_000, 100_000)
+        assert chapters == [
+            {"title": "B", "start_time_ms": 0.0},
+            {"title": "C", "start_time_ms": 20_000.0},
+        ]
+
+    def test_part_inside_one_chapter(self):
+        chapters = upload_mp3._chapters_in_range(self.CHAPTERS, 0, 30_000)
+        assert chapters == [{"title": "A", "start_time_ms": 0.0}]
+
+
 # ---------------------------------------------------------------------------
 # _create_metadata  (chapter-aware)
 # ---------------------------------------------------------------------------
@@ -170,7 +205,13 @@ class TestCreateMetadataWithChapters:
 
 
 class TestUploadSingleFile:
-    @patch("upload_mp3.requests.post")
+    def test_session_retries_connect_errors_only(self):
+        retry = upload_mp3._SESSION.get_adapter("https://example.com/api").max_retries
+        assert retry.connect == 2
+        assert retry.read == 0  # a streamed body can't be replayed
+        assert retry.status == 0  # 5xx: upload_single_file's backoff loop
+
+    @patch("upload_mp3._SESSION.post")
     def test_success_on_first_attempt(self, mock_post, fake_mp3):
         mock_resp = MagicMock()
         mock_resp.status_code = 200
@@ -187,7 +228,7 @@ class TestUploadSingleFile:
         assert result is True
         mock_post.assert_called_once()
 
-    @patch("upload_mp3.requests.post")
+    @patch("upload_mp3._SESSION.post")
     def test_non_retriable_http_error(self, mock_post, fake_mp3):
         resp = MagicMock()
         resp.status_code = 400
@@ -205,7 +246,7 @@ class TestUploadSingleFile:
         assert result is False
 
     @patch("upload_mp3.time.sleep")
-    @patch("upload_mp3.requests.post")
+    @patch("upload_mp3._SESSION.post")
     def test_retries_on_server_error_then_succeeds(self, mock_post, mock_sleep, fake_mp3):
         # First call: 500 error, second call: success
         fail_resp = MagicMock()
@@ -232,7 +273,7 @@ class TestUploadSingleFile:
         mock_sleep.assert_called_once_with(10)  # base_delay * 2^0
 
     @patch("upload_mp3.time.sleep")
-    @patch("upload_mp3.requests.post")
+    @patch("upload_mp3._SESSION.post")
     def test_retries_on_network_error_then_succeeds(self, mock_post, mock_sleep, fake_mp3):
         ok_resp = MagicMock()
         ok_resp.status_code = 200
@@ -254,7 +295,7 @@ class TestUploadSingleFile:
         assert mock_post.call_count == 2
 
     @patch("upload_mp3.time.sleep")
-    @patch("upload_mp3.requests.post")
+    @patch("upload_mp3._SESSION.post")
     def test_fails_after_max_retries(self, mock_post, mock_sleep, fake_mp3):
         fail_resp = MagicMock()
         fail_resp.status_code = 503
@@ -281,7 +322,7 @@ class TestUploadSingleFile:
         )
         assert result is False
 
-    @patch("upload_mp3.requests.post")
+    @patch("upload_mp3._SESSION.post")
     def test_authorization_header(self, mock_post, fake_mp3):
         mock_resp = MagicMock()
         mock_resp.json.return_value = {}
@@ -297,7 +338,21 @@ class TestUploadSingleFile:
         called_headers = mock_post.call_args[1]["headers"]
         assert called_headers["Authorization"] == "Bearer my-secret-key"
 
-    @patch("upload_mp3.requests.post")
+    @patch("upload_mp3._SESSION.post")
+    def test_streams_multipart_body(self, mock_post, fake_mp3):
+        mock_resp = MagicMock()
+        mock_resp.json.return_value = {}
+        mock_post.return_value = mock_resp
+
+        upload_mp3.upload_single_file(
+            "https://example.com/api", "key", str(fake_mp3), {"title": "t"}
+        )
+        kwargs = mock_post.call_args[1]
+        assert "files" not in kwargs
+        assert kwargs["headers"]["Content-Type"].startswith("multipart/form-data; boundary=")
+        assert kwargs["headers"]["Content-Type"] == kwargs["data"].content_type
+
+    @patch("upload_mp3._SESSION.post")
     def test_posts_to_correct_url(self, mock_post, fake_mp3):
         mock_resp = MagicMock()
         mock_resp.json.return_value = {}
@@ -313,7 +368,7 @@ class TestUploadSingleFile:
         assert mock_post.call_args[0][0] == "https://example.com/api/audiobooks"
 
     @patch("upload_mp3.time.sleep")
-    @patch("upload_mp3.requests.post")
+    @patch("upload_mp3._SESSION.post")
     def test_exponential_backoff_delays(self, mock_post, mock_sleep, fake_mp3):
         """Verify sleep durations grow exponentially on repeated server errors."""
         fail_resp = MagicMock()
@@ -350,7 +405,8 @@ class TestUploadAudiobook:
 
     @patch("upload_mp3.split_and_upload_chunks", return_value=True)
     @patch("upload_mp3.AudioSegment.from_mp3")
-    def test_large_file_triggers_chunking(self, mock_from_mp3, mock_split, tmp_path):
+    @patch("upload_mp3._segment_mp3", return_value=None)
+    def test_large_file_triggers_chunking(self, mock_segment, mock_from_mp3, mock_split, tmp_path):
         # Create a file > MAX_UPLOAD_SIZE_MB
         big_mp3 = tmp_path / "big.mp3"
         big_mp3.write_bytes(b"\x00" * int(40 * 1024 * 1024))  # 40 MB
@@ -365,6 +421,60 @@ class TestUploadAudiobook:
         assert result is True
         mock_split.assert_called_once()
 
+    @patch("upload_mp3.upload_single_file", return_value=True)
+    @patch("upload_mp3._mp3_duration_ms", return_value=120_000.0)
+    @patch("upload_mp3.AudioSegment.from_mp3")
+    @patch("upload_mp3._segment_mp3", return_value=["a_part_1_of_2.mp3", "a_part_2_of_2.mp3"])
+    def test_large_file_uploads_ffmpeg_parts_without_decoding(
+        self, mock_segment, mock_from_mp3, mock_duration, mock_upload, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(upload_mp3, "ARCHIVE_FOLDER", str(tmp_path / "archive"))
+        big_mp3 = tmp_path / "big.mp3"
+        big_mp3.write_bytes(b"\x00" * int(40 * 1024 * 1024))
+
+        result = upload_mp3.upload_audiobook(
+            "https://example.com/api", "key", str(big_mp3), base_title="Big"
+        )
+
+        assert result is True
+        mock_segment.assert_called_once_with(big_mp3, 2, ANY)
+        mock_from_mp3.assert_not_called()
+        titles = [c[0][3]["title"] for c in mock_upload.call_args_list]
+        assert titles == ["Big (Part 1 of 2)", "Big (Part 2 of 2)"]
+
+    @patch("upload_mp3.upload_single_file", return_value=True)
+    @patch("upload_mp3._mp3_duration_ms", return_value=120_000.0)
+    @patch("upload_mp3.subprocess.run")
+    def test_large_file_parts_are_fresh_and_removed_after_upload(
+        self, mock_run, mock_duration, mock_upload, tmp_path, monkeypatch
+    ):
+        archive = tmp_path / "archive"
+        archive.mkdir()
+        monkeypatch.setattr(upload_mp3, "ARCHIVE_FOLDER", str(archive))
+        # Left behind by an earlier, longer run.
+        (archive / "big_part_3.mp3").write_bytes(b"")
+        big_mp3 = tmp_path / "big.mp3"
+        big_mp3.write_bytes(b"\x00" * int(40 * 1024 * 1024))
+
+        def fake_ffmpeg(cmd, **kwargs):
+            for i in (1, 2):
+                Path(cmd[-1] % i).write_bytes(b"")
+
+        mock_run.side_effect = fake_ffmpeg
+
+        result = upload_mp3.upload_audiobook(
+            "https://example.com/api", "key", str(big_mp3), base_title="Big"
+        )
+
+        assert result is True
+        uploaded = [c[0][2] for c in mock_upload.call_args_list]
+        assert [Path(p).name for p in uploaded] == [
+            "big_part_1_of_2.mp3",
+            "big_part_2_of_2.mp3",
+        ]
+        assert not any(os.path.exists(p) for p in uploaded)
+        assert sorted(os.listdir(archive)) == ["big_part_3.mp3"]
+
     def test_missing_file_returns_false(self):
         result = upload_mp3.upload_audiobook(
             "https://example.com/api", "key", "/no/such/file.mp3"
@@ -411,6 +521,35 @@ class TestUploadAudiobook:
         assert "Chapter 1" in chapters
         assert "Conclusion" in chapters
 
+    @patch("upload_mp3.upload_single_file", return_value=True)
+    @patch("upload_mp3.AudioSegment.from_mp3")
+    @patch("upload_mp3.MP3")
+    def test_small_file_reads_duration_from_header(
+        self, mock_mp3, mock_from_mp3, mock_upload, fake_mp3
+    ):
+        mock_mp3.return_value.info.length = 90.5
+
+        upload_mp3.upload_audiobook(
+            "https://example.com/api", "key", str(fake_mp3), base_title="Header"
+        )
+        mock_from_mp3.assert_not_called()
+        assert mock_upload.call_args[0][3]["duration_seconds"] == 90
+
+    @patch("upload_mp3.upload_single_file", return_value=True)
+    @patch("upload_mp3.AudioSegment.from_mp3")
+    @patch("upload_mp3.subprocess.check_output", return_value=b"42.5\n")
+    @patch("upload_mp3.shutil.which", return_value="/usr/bin/ffprobe")
+    @patch("upload_mp3.MP3", side_effect=Exception("no header"))
+    def test_falls_back_to_ffprobe_for_duration(
+        self, mock_mp3, mock_which, mock_check_output, mock_from_mp3, mock_upload, fake_mp3
+    ):
+        upload_mp3.upload_audiobook(
+            "https://example.com/api", "key", str(fake_mp3), base_title="Probe"
+        )
+        mock_from_mp3.assert_not_called()
+        assert mock_check_output.call_args[0][0][0] == "/usr/bin/ffprobe"
+        assert mock_upload.call_args[0][3]["duration_seconds"] == 42
+
     @patch("upload_mp3.AudioSegment.from_mp3", side_effect=Exception("corrupt file"))
     def test_handles_audio_processing_error(self, mock_from_mp3, fake_mp3):
         result = upload_mp3.upload_audiobook(
@@ -419,6 +558,67 @@ class TestUploadAudiobook:
         assert result is False
 
 
+# ---------------------------------------------------------------------------
+# _segment_mp3
+# ---------------------------------------------------------------------------
+
+
+class TestSegmentMp3:
+    @patch("upload_mp3._mp3_duration_ms", return_value=90_000.0)
+    @patch("upload_mp3.subprocess.run", side_effect=FileNotFoundError("ffmpeg"))
+    def test_returns_none_without_ffmpeg(self, mock_run, mock_duration, fake_mp3, tmp_path):
+        assert upload_mp3._segment_mp3(fake_mp3, 2, str(tmp_path)) is None
+
+    @patch("upload_mp3._mp3_duration_ms", return_value=90_000.0)
+    @patch("upload_mp3.subprocess.run")
+    @patch("upload_mp3._ffmpeg_exe", return_value="/opt/imageio/ffmpeg")
+    def test_copies_frames_and_names_parts(
+        self, mock_exe, mock_run, mock_duration, fake_mp3, tmp_path
+    ):
+        def fake_ffmpeg(cmd, **kwargs):
+            for i in (1, 2):
+                (tmp_path / f"test_audio_part_{i}.mp3").write_bytes(b"")
+
+        mock_run.side_effect = fake_ffmpeg
+
+        parts = upload_mp3._segment_mp3(fake_mp3, 2, str(tmp_path))
+
+        cmd = mock_run.call_args[0][0]
+        assert cmd[0] == "/opt/imageio/ffmpeg"
+        assert cmd[cmd.index("-c") + 1] == "copy"
+        assert cmd[cmd.index("-segment_time") + 1] == "45.000"
+        assert [Path(p).name for p in parts] == [
+            "test_audio_part_1_of_2.mp3",
+            "test_audio_part_2_of_2.mp3",
+        ]
+
+    @patch("upload_mp3._mp3_duration_ms", return_value=90_000.0)
+    @patch("upload_mp3.subprocess.run")
+    def test_escapes_percent_in_output_path(self, mock_run, mock_duration, tmp_path):
+        mp3 = tmp_path / "100% news.mp3"
+        mp3.write_bytes(b"")
+        out_dir = tmp_path / "50%d parts"
+        out_dir.mkdir()
+
+        def fake_ffmpeg(cmd, **kwargs):
+            assert cmd[-1].endswith(os.path.join("50%%d parts", "100%% news_part_%d.mp3"))
+            (out_dir / "100% news_part_1.mp3").write_bytes(b"")
+
+        mock_run.side_effect = fake_ffmpeg
+
+        parts = upload_mp3._segment_mp3(mp3, 1, str(out_dir))
+
+        assert [Path(p).name for p in parts] == ["100% news_part_1_of_1.mp3"]
+
+    @patch("upload_mp3._mp3_duration_ms", return_value=90_000.0)
+    @patch(
+        "upload_mp3.subprocess.run",
+        side_effect=subprocess.CalledProcessError(1, "ffmpeg"),
+    )
+    def test_returns_none_when_ffmpeg_fails(self, mock_run, mock_duration, fake_mp3, tmp_path):
+        assert upload_mp3._segment_mp3(fake_mp3, 2, str(tmp_path)) is None
+
+
 # ---------------------------------------------------------------------------
 # split_and_upload_chunks
 # ---------------------------------------------------------------------------
@@ -511,6 +711,25 @@ class TestSplitAndUploadChunks:
         chapters = json.loads(metadata["chapters_json"])
         assert "Introduction" in chapters
 
+    @patch("upload_mp3.upload_single_file", return_value=True)
+    def test_each_part_lists_only_its_own_chapters(self, mock_upload, mock_audio_segment):
+        blocks = [
+            {"title": "First", "text": "x" * 10},
+            {"title": "Second", "text": "x" * 10},
+        ]
+
+        upload_mp3.split_and_upload_chunks(
+            "https://example.com/api",
+            "key",
+            Path("audio.mp3"),
+            mock_audio_segment,
+            "Title",
+            70.0,
+            text_blocks=blocks,
+        )
+        parts = [json.loads(c[0][3]["chapters_json"]) for c in mock_upload.call_args_list]
+        assert parts == [{"First": 0}, {"Second": 0}]
+
 
 # ---------------------------------------------------------------------------
 # main (CLI entry-point)